@@ -0,0 +1,171 @@
+"""
+Buffered analytics ingestion for public guest tracking endpoints
+
+Guest events are aggregated in memory per profile (counters, device, hour,
+day, language, interaction) and flushed as merged $inc bulk upserts every
+flush interval or once enough events have accumulated, so a tracking request
+costs no database writes of its own.
+"""
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+class _ProfileAggregate:
+    """Pending analytics increments for one profile"""
+
+    __slots__ = ("increments", "first_viewed_at", "last_viewed_at", "created_at")
+
+    def __init__(self, created_at: str):
+        self.increments: Counter = Counter()
+        self.first_viewed_at: Optional[str] = None
+        self.last_viewed_at: Optional[str] = None
+        self.created_at = created_at
+
+
+class AnalyticsBuffer:
+    """
+    In-process aggregation buffer with periodic flush
+
+    Args:
+        db: Motor database
+        flush_interval_ms: Maximum time events wait before being written
+        max_events: Number of buffered events that triggers an early flush
+    """
+
+    def __init__(self, db, flush_interval_ms: int = 1000, max_events: int = 500):
+        self.db = db
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_events = max_events
+        self._profiles: Dict[str, _ProfileAggregate] = {}
+        # (session_id, profile_id) -> session document for unique-view detection
+        self._sessions: Dict[Tuple[str, str], dict] = {}
+        self._event_count = 0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    # ---------- recording (O(1), never awaits) ----------
+
+    def _aggregate(self, profile_id: str, now: datetime) -> _ProfileAggregate:
+        aggregate = self._profiles.get(profile_id)
+        if aggregate is None:
+            aggregate = self._profiles[profile_id] = _ProfileAggregate(now.isoformat())
+        return aggregate
+
+    def _count_event(self) -> None:
+        self._event_count += 1
+        if self._event_count >= self.max_events:
+            self._wakeup.set()
+
+    def record_view(self, profile_id: str, session_id: str, device_type: str, now: datetime) -> None:
+        """Buffer an invitation view"""
+        aggregate = self._aggregate(profile_id, now)
+        aggregate.increments["total_views"] += 1
+        aggregate.increments[f"{device_type}_views"] += 1
+        aggregate.increments[f"hourly_distribution.{now.hour}"] += 1
+        aggregate.increments[f"daily_view_counts.{now.date().isoformat()}"] += 1
+
+        timestamp = now.isoformat()
+        if aggregate.first_viewed_at is None or timestamp < aggregate.first_viewed_at:
+            aggregate.first_viewed_at = timestamp
+        if aggregate.last_viewed_at is None or timestamp > aggregate.last_viewed_at:
+            aggregate.last_viewed_at = timestamp
+
+        # Sessions last 24 hours; the first view of a session in a batch defines it
+        self._sessions.setdefault((session_id, profile_id), {
+            "id": str(uuid.uuid4()),
+            "device_type": device_type,
+            "created_at": timestamp,
+            "expires_at": (now + timedelta(hours=24)).isoformat()
+        })
+        self._count_event()
+
+    def record_counter(self, profile_id: str, field: str, now: datetime) -> None:
+        """Buffer a single counter increment (language view, interaction)"""
+        self._aggregate(profile_id, now).increments[field] += 1
+        self._count_event()
+
+    # ---------- flushing ----------
+
+    async def flush(self) -> None:
+        """Write all buffered events as bulk upserts"""
+        async with self._flush_lock:
+            profiles, self._profiles = self._profiles, {}
+            sessions, self._sessions = self._sessions, {}
+            self._event_count = 0
+            self._wakeup.clear()
+
+            if not profiles:
+                return
+
+            try:
+                await self._write(profiles, sessions)
+            except Exception as e:
+                # Drop the batch rather than risk double counting on retry
+                logger.error(f"Failed to flush analytics for {len(profiles)} profiles: {e}")
+
+    async def _write(self, profiles: Dict[str, _ProfileAggregate], sessions: Dict[Tuple[str, str], dict]) -> None:
+        if sessions:
+            keys = list(sessions)
+            # An upserted (inserted) session means a unique view
+            result = await self.db.view_sessions.bulk_write([
+                UpdateOne(
+                    {
+                        "session_id": session_id,
+                        "profile_id": profile_id,
+                        "expires_at": {"$gt": sessions[(session_id, profile_id)]['created_at']}
+                    },
+                    {"$setOnInsert": sessions[(session_id, profile_id)]},
+                    upsert=True
+                )
+                for session_id, profile_id in keys
+            ], ordered=False)
+
+            for index in result.upserted_ids:
+                profiles[keys[index][1]].increments["unique_views"] += 1
+
+        operations = []
+        for profile_id, aggregate in profiles.items():
+            update = {
+                "$inc": dict(aggregate.increments),
+                "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": aggregate.created_at}
+            }
+            if aggregate.first_viewed_at:
+                update["$min"] = {"first_viewed_at": aggregate.first_viewed_at}
+                update["$max"] = {"last_viewed_at": aggregate.last_viewed_at}
+            operations.append(UpdateOne({"profile_id": profile_id}, update, upsert=True))
+
+        await self.db.analytics.bulk_write(operations, ordered=False)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and drain buffered events"""
+        if self._task is not None:
+            # Let an in-flight flush finish instead of cancelling it mid-write
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
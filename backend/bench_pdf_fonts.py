@@ -0,0 +1,107 @@
+"""
+Benchmark invitation PDF size and render latency, subset vs embedded fonts
+
+For every language with a script font, this renders the same sample invitation
+twice through generate_invitation_pdf:
+
+    subset:   the normal render; ReportLab embeds only the glyphs drawn
+    embedded: additionally draws every character the font maps as invisible
+              text on page one, so the whole glyph set is embedded
+
+and prints PDF sizes plus cold (first render in the process, including font
+registration and parsing) and warm latencies. Run fetch_pdf_fonts.py first.
+
+Usage: python bench_pdf_fonts.py [iterations]
+"""
+import sys
+import time
+from unittest import mock
+
+import pdf_assets
+import pdf_generator
+from pdf_assets import LANGUAGE_FONT_FILES, PDF_FONT_DIR
+from pdf_generator import generate_invitation_pdf
+
+SAMPLE_PROFILE = {
+    'id': 'bench',
+    'groom_name': 'Rahul',
+    'bride_name': 'Priya',
+    'design_id': 'temple_divine',
+    'deity_id': 'none',
+    'whatsapp_groom': '+919876543210',
+    'whatsapp_bride': '+919876543211',
+    'events': [
+        {
+            'name': name,
+            'date': f'2026-12-{day:02d}',
+            'start_time': '10:00',
+            'end_time': '13:00',
+            'venue_name': 'Sri Venkateswara Kalyana Mandapam',
+            'venue_address': 'Road No. 12, Banjara Hills, Hyderabad',
+            'description': 'Lunch will be served after the ceremony.',
+            'visible': True
+        }
+        for day, name in enumerate(['Haldi', 'Mehendi', 'Sangeet', 'Wedding', 'Reception'], start=10)
+    ]
+}
+
+
+def _draw_whole_font(canvas_obj, font: pdf_assets.LanguageFont) -> None:
+    text = canvas_obj.beginText(0, 0)
+    text.setTextRenderMode(3)  # invisible
+    text.setFont(font.regular, 10)
+    text.textOut(''.join(chr(code) for code in sorted(font.charset) if code > 32))
+    canvas_obj.drawText(text)
+
+
+def _render(language: str, embed_whole_font: bool) -> bytes:
+    if not embed_whole_font:
+        return generate_invitation_pdf(SAMPLE_PROFILE, language)
+
+    # The page callback used for deity backgrounds is the only hook into the canvas
+    font = pdf_assets.get_language_font(language)
+    with mock.patch.object(pdf_generator, 'get_deity_background', return_value=font), \
+            mock.patch.object(pdf_generator, 'draw_deity_background', _draw_whole_font):
+        return generate_invitation_pdf(SAMPLE_PROFILE, language)
+
+
+def _reset_fonts() -> None:
+    # Forget registered fonts so the next render pays the cold-start cost again
+    pdf_assets._language_fonts.clear()
+    pdf_generator._compile_pdf_template.cache_clear()
+
+
+def _time_renders(language: str, embed_whole_font: bool, iterations: int):
+    _reset_fonts()
+    started = time.perf_counter()
+    pdf = _render(language, embed_whole_font)
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        _render(language, embed_whole_font)
+    warm_ms = (time.perf_counter() - started) * 1000 / iterations
+
+    return len(pdf), cold_ms, warm_ms
+
+
+def main(iterations: int) -> None:
+    print(f"Font directory: {PDF_FONT_DIR}, {iterations} warm renders per row\n")
+    print(f"{'language':<10} {'fonts':<9} {'pdf KB':>8} {'font file KB':>13} {'cold ms':>8} {'warm ms':>8}")
+
+    for language, files in LANGUAGE_FONT_FILES.items():
+        if pdf_assets.get_language_font(language) is None:
+            print(f"{language:<10} skipped, {files[0]} not available")
+            continue
+
+        font_file_size = (PDF_FONT_DIR / files[0]).stat().st_size
+        for label, embed_whole_font in (('subset', False), ('embedded', True)):
+            size, cold_ms, warm_ms = _time_renders(language, embed_whole_font, iterations)
+            print(
+                f"{language:<10} {label:<9} {size / 1024:>8.1f} {font_file_size / 1024:>13.1f} "
+                f"{cold_ms:>8.1f} {warm_ms:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
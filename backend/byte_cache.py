@@ -0,0 +1,125 @@
+"""
+Two-tier cache of immutable byte blobs, plus the atomic file write it uses
+
+Tiers:
+    memory: per-worker LRU bounded by total bytes
+    disk:   optional directory shared by workers and restarts
+
+Callers build keys from everything the blob depends on, so entries never go
+stale and there is no expiry. A key is also the entry's path relative to
+disk_dir (for example "<profile id>/<hash>.pdf"), so callers must only build
+keys from trusted parts.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write data to path via a temp file and rename, so readers never see partial data"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def read_file(path: Path) -> Optional[bytes]:
+    """Contents of path, or None if it does not exist"""
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+class ByteCache:
+    """
+    Byte-bounded memory LRU in front of an optional disk directory
+
+    Args:
+        name: Used in log messages
+        max_bytes: Memory tier budget (0 disables the memory tier)
+        disk_dir: Directory for the disk tier (None disables it)
+        on_remember: Called with the key of every entry added to the memory tier
+        on_forget: Called with the key of every entry leaving the memory tier
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        disk_dir: Optional[Path] = None,
+        on_remember: Optional[Callable[[str], None]] = None,
+        on_forget: Optional[Callable[[str], None]] = None
+    ):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.on_remember = on_remember
+        self.on_forget = on_forget
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def remember(self, key: str, data: bytes) -> None:
+        """Keep data in the memory tier unless it is larger than the whole budget"""
+        if len(data) > self.max_bytes:
+            return
+
+        self.forget(key)
+        self._entries[key] = data
+        self._size += len(data)
+        if self.on_remember is not None:
+            self.on_remember(key)
+
+        while self._size > self.max_bytes:
+            self.forget(next(iter(self._entries)))
+
+    def forget(self, key: str) -> None:
+        """Drop an entry from the memory tier"""
+        data = self._entries.pop(key, None)
+        if data is None:
+            return
+        self._size -= len(data)
+        if self.on_forget is not None:
+            self.on_forget(key)
+
+    def _write_disk(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, data)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Cached bytes from the first tier holding key, or None"""
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            return data
+
+        if self.disk_dir is None:
+            return None
+
+        data = await asyncio.to_thread(read_file, self.disk_dir / key)
+        if data is not None:
+            self.remember(key, data)
+        return data
+
+    async def set(self, key: str, data: bytes) -> None:
+        """Store bytes in every enabled tier (disk write failures are logged, not raised)"""
+        self.remember(key, data)
+
+        if self.disk_dir is not None:
+            try:
+                await asyncio.to_thread(self._write_disk, self.disk_dir / key, data)
+            except OSError as e:
+                logger.error(f"Failed to write {self.name} cache entry {key}: {e}")
@@ -0,0 +1,100 @@
+"""
+In-process caching primitives for hot public read paths
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with a per-entry time-to-live and tag-based invalidation
+
+    Entries can be tagged (e.g. with a profile id) so that every value derived
+    from a profile can be dropped in one call when that profile is written to.
+    The cache lives in a single event loop, so no locking is required.
+
+    A reader that loads a value across awaits can pass the generation() it saw
+    before loading to set(); the value is then dropped if any invalidation
+    happened in between, instead of re-caching data a writer just replaced.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, Any, Optional[str]]]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached value or None if missing/expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value, _ = entry
+        if time.monotonic() >= expires_at:
+            self._drop(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def generation(self) -> int:
+        """Counter bumped by every invalidation"""
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, tag: Optional[str] = None, generation: Optional[int] = None) -> None:
+        """Store value, evicting the least recently used entry when full"""
+        if self.max_entries <= 0:
+            return
+
+        if generation is not None and generation != self._generation:
+            # Invalidated while the value was being loaded; it may be stale
+            return
+
+        if key in self._entries:
+            self._drop(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tag)
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._drop(oldest_key)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        self._generation += 1
+        self._drop(key)
+
+    def _drop(self, key: Hashable) -> None:
+        # Removal without a generation bump (expiry, eviction, replacement)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        tag = entry[2]
+        if tag is not None:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate_tag(self, tag: Optional[str]) -> None:
+        """Drop every entry stored under tag"""
+        if tag is None:
+            return
+        self._generation += 1
+        for key in list(self._tags.pop(tag, ())):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._tags.clear()
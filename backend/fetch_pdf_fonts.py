@@ -0,0 +1,53 @@
+"""
+Download the Noto Sans fonts used by Indic invitation PDFs
+Run this script once per deployment (or bake its output into the image):
+
+    python fetch_pdf_fonts.py
+
+Files listed in pdf_assets.LANGUAGE_FONT_FILES are saved to PDF_FONT_DIR
+(default backend/fonts). Files already present are left alone. Without them,
+Telugu, Hindi, Tamil, Kannada and Malayalam PDFs fall back to Helvetica.
+"""
+import sys
+import urllib.request
+
+from byte_cache import atomic_write
+from pdf_assets import LANGUAGE_FONT_FILES, PDF_FONT_DIR
+
+# Hinted TTFs published by the Noto project
+NOTO_FONTS_URL = "https://github.com/notofonts/notofonts.github.io/raw/main/fonts/{family}/hinted/ttf/{filename}"
+
+
+def fetch_font(filename: str) -> bool:
+    path = PDF_FONT_DIR / filename
+    if path.exists():
+        print(f"✓ {filename} already present")
+        return True
+
+    family = filename.split('-')[0]
+    url = NOTO_FONTS_URL.format(family=family, filename=filename)
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response:
+            data = response.read()
+    except Exception as e:
+        print(f"✗ {filename}: {e}")
+        return False
+
+    # Write atomically so a failed download never leaves a truncated font
+    atomic_write(path, data)
+
+    print(f"✓ {filename} ({len(data) // 1024} KB)")
+    return True
+
+
+def main() -> int:
+    PDF_FONT_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"Fetching PDF fonts into {PDF_FONT_DIR}")
+
+    filenames = sorted({name for files in LANGUAGE_FONT_FILES.values() for name in files})
+    results = [fetch_font(filename) for filename in filenames]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Image transcoding run inside worker processes (see workers.py)
+
+Functions here take and return plain picklable data so they can cross the process
+boundary, and must not touch the database or the event loop.
+"""
+import base64
+import io
+from typing import List, NamedTuple
+
+from PIL import Image as PILImage
+
+# Uploaded photos are stored at most this wide
+MAX_PHOTO_WIDTH = 1920
+
+# Responsive derivative widths generated at upload (for srcset)
+DERIVATIVE_WIDTHS = (320, 640, 1280, 1920)
+
+# Width of the inline blur-up placeholder
+PLACEHOLDER_WIDTH = 16
+
+
+class Rendition(NamedTuple):
+    width: int
+    height: int
+    data: bytes  # WebP bytes
+
+
+class TranscodedPhoto(NamedTuple):
+    renditions: List[Rendition]  # Ascending width; the last one is the full-size photo
+    placeholder: str  # data: URI of a tiny WebP for blur-up loading
+
+    @property
+    def full(self) -> Rendition:
+        return self.renditions[-1]
+
+
+def flatten_to_rgb(img: PILImage.Image) -> PILImage.Image:
+    """Composite transparent images onto white and return an RGB image"""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        background = PILImage.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+        return background
+    return img
+
+
+def _resize_to_width(img: PILImage.Image, width: int) -> PILImage.Image:
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), PILImage.Resampling.LANCZOS)
+
+
+def _encode_webp(img: PILImage.Image, quality: int) -> bytes:
+    output = io.BytesIO()
+    img.save(output, format='WebP', quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def transcode_photo(source_path: str, quality: int = 85) -> TranscodedPhoto:
+    """
+    Decode an uploaded image file and encode the full-size WebP plus its derivatives
+
+    The full-size rendition is flattened and downscaled to MAX_PHOTO_WIDTH;
+    each DERIVATIVE_WIDTHS entry narrower than it gets its own rendition.
+    Large JPEGs are decoded at a reduced DCT scale (Image.draft), so the full
+    resolution bitmap is never materialized.
+
+    Raises ValueError for data Pillow cannot decode.
+    """
+    try:
+        img = PILImage.open(source_path)
+        if img.format == 'JPEG' and img.width > MAX_PHOTO_WIDTH:
+            # Picks the smallest 1/2, 1/4 or 1/8 scale still at least MAX_PHOTO_WIDTH wide
+            img.draft(img.mode, (MAX_PHOTO_WIDTH, max(1, img.height * MAX_PHOTO_WIDTH // img.width)))
+        img = flatten_to_rgb(img)
+
+        if img.width > MAX_PHOTO_WIDTH:
+            img = _resize_to_width(img, MAX_PHOTO_WIDTH)
+
+        renditions = []
+        for width in DERIVATIVE_WIDTHS:
+            if width < img.width:
+                derivative = _resize_to_width(img, width)
+                renditions.append(Rendition(derivative.width, derivative.height, _encode_webp(derivative, quality)))
+        renditions.append(Rendition(img.width, img.height, _encode_webp(img, quality)))
+
+        tiny = _resize_to_width(img, min(PLACEHOLDER_WIDTH, img.width))
+        placeholder = "data:image/webp;base64," + base64.b64encode(_encode_webp(tiny, 30)).decode()
+
+        return TranscodedPhoto(renditions, placeholder)
+    except Exception as e:
+        # Pillow exceptions are not all picklable; surface a plain error to the parent
+        raise ValueError(str(e)) from None
@@ -0,0 +1,133 @@
+"""
+MongoDB index declarations and idempotent startup provisioning
+
+Every query shape used by server.py is backed by an index declared here.
+ensure_indexes() creates missing indexes and reports drift: declared indexes
+that conflict with an existing definition, and existing indexes that are not
+declared at all.
+"""
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "admins": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "profiles": [
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Admin profile/template listings sorted by creation date
+        IndexModel([("is_template", ASCENDING), ("created_at", DESCENDING)], name="is_template_created_at"),
+    ],
+    "media_files": [
+        # One reference-count document per stored photo; acquire relies on the uniqueness
+        IndexModel([("content_hash", ASCENDING)], name="content_hash_unique", unique=True),
+    ],
+    "profile_media": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("profile_id", ASCENDING), ("order", ASCENDING)], name="profile_id_order"),
+        # Reference counting of shared photo files on delete
+        IndexModel([("content_hash", ASCENDING)], name="content_hash"),
+    ],
+    "greetings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("profile_id", ASCENDING), ("approval_status", ASCENDING), ("created_at", DESCENDING)],
+            name="profile_id_approval_status_created_at"
+        ),
+        # Admin listing without a status filter
+        IndexModel([("profile_id", ASCENDING), ("created_at", DESCENDING)], name="profile_id_created_at"),
+    ],
+    "rsvps": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("profile_id", ASCENDING), ("guest_phone", ASCENDING)], name="profile_id_guest_phone"),
+        IndexModel([("profile_id", ASCENDING), ("created_at", DESCENDING)], name="profile_id_created_at"),
+    ],
+    "event_invitations": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("profile_id", ASCENDING), ("event_type", ASCENDING)], name="profile_id_event_type_unique", unique=True),
+    ],
+    "invitation_snapshots": [
+        IndexModel([("slug", ASCENDING), ("variant", ASCENDING)], name="slug_variant_unique", unique=True),
+        IndexModel([("profile_id", ASCENDING)], name="profile_id"),
+    ],
+    "view_sessions": [
+        IndexModel(
+            [("session_id", ASCENDING), ("profile_id", ASCENDING), ("expires_at", ASCENDING)],
+            name="session_id_profile_id_expires_at"
+        ),
+    ],
+    "rate_limits": [
+        IndexModel(
+            [("ip_address", ASCENDING), ("endpoint", ASCENDING), ("date", ASCENDING)],
+            name="ip_address_endpoint_date_unique",
+            unique=True
+        ),
+        # Purge counters once their day has passed (expires_at is a BSON date)
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "analytics": [
+        IndexModel([("profile_id", ASCENDING)], name="profile_id_unique", unique=True),
+    ],
+    "audit_logs": [
+        IndexModel([("timestamp", DESCENDING)], name="timestamp"),
+    ],
+}
+
+
+def _index_signature(spec: dict) -> tuple:
+    """Comparable (keys, unique, ttl) signature of an index definition"""
+    keys = spec["key"]
+    if isinstance(keys, dict):
+        keys = keys.items()
+    return (
+        tuple((field, int(direction)) for field, direction in keys),
+        bool(spec.get("unique", False)),
+        spec.get("expireAfterSeconds"),
+    )
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create every declared index (no-op for indexes that already exist)
+
+    Returns:
+        Drift report mapping collection name to a list of human-readable problems
+    """
+    drift: Dict[str, List[str]] = {}
+
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        problems = []
+
+        for model in models:
+            try:
+                await collection.create_indexes([model])
+            except OperationFailure as e:
+                # Same keys with different options/name, or data violating a unique index
+                problems.append(f"could not create {model.document['name']}: {e}")
+
+        existing = await collection.index_information()
+        declared = {model.document["name"]: _index_signature(model.document) for model in models}
+
+        for name, info in existing.items():
+            if name == "_id_":
+                continue
+            if name not in declared:
+                problems.append(f"undeclared index {name} {info['key']}")
+            elif declared[name] != _index_signature(info):
+                problems.append(f"index {name} differs from declaration: {info}")
+
+        if problems:
+            drift[collection_name] = problems
+            for problem in problems:
+                logger.warning(f"Index drift on {collection_name}: {problem}")
+
+    return drift
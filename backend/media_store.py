@@ -0,0 +1,166 @@
+"""
+Content-addressed storage for transcoded photo files
+
+Files are named by the SHA-256 of their bytes, so identical photos uploaded to
+several profiles (or re-uploaded) share one file and every URL is immutable.
+
+A stored photo is identified by the content_hash of its full-size rendition.
+The media_files collection keeps one document per photo with an explicit
+reference count and the URLs of its files:
+
+    acquire: $inc refs (upsert), then write any missing files
+    release: $inc refs by -1; the caller that takes it to 0 claims the
+             document (deleting_at), unlinks the files and removes it
+
+An acquire that finds the document claimed waits until it is removed, so
+files are never unlinked underneath a new reference. A claim older than
+STALE_DELETE_SECONDS (a crashed deleter) is taken over by the next acquire,
+which rewrites any missing files.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from byte_cache import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# How long an acquire waits for a concurrent delete of the same photo
+ACQUIRE_TIMEOUT_SECONDS = 10
+STALE_DELETE_SECONDS = 60
+
+
+def content_hash(data: bytes) -> str:
+    """Hex SHA-256 digest used as a stored file's name"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class MediaStore:
+    """
+    Deduplicating file store under a directory served at url_prefix
+
+    Args:
+        root: Directory holding the files
+        url_prefix: Public URL path the directory is mounted at
+        files: media_files collection holding reference counts
+    """
+
+    def __init__(self, root: Path, url_prefix: str, files):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self.files = files
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def url_for(self, filename: str) -> str:
+        return f"{self.url_prefix}/{filename}"
+
+    def filename_for_url(self, url: str) -> Optional[str]:
+        """Stored filename for a URL under url_prefix, None for other URLs"""
+        prefix = self.url_prefix + "/"
+        if not url or not url.startswith(prefix):
+            return None
+        filename = url[len(prefix):]
+        # Never resolve outside root
+        if not filename or "/" in filename or filename.startswith("."):
+            return None
+        return filename
+
+    def save(self, data: bytes, extension: str = ".webp") -> str:
+        """
+        Store bytes under their content hash and return the public URL
+
+        Writing is skipped when the file already exists; new files are written
+        to a temp file and renamed into place so readers never see partial data.
+        """
+        filename = f"{content_hash(data)}{extension}"
+        path = self.root / filename
+
+        if not path.exists():
+            atomic_write(path, data)
+
+        return self.url_for(filename)
+
+    def delete_urls(self, urls: Iterable[str]) -> None:
+        """Remove the stored files behind urls (URLs outside the store are ignored)"""
+        for url in urls:
+            filename = self.filename_for_url(url)
+            if filename is None:
+                continue
+            try:
+                (self.root / filename).unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Failed to delete media file {filename}: {e}")
+
+    def _save_all(self, renditions: List[bytes], extension: str) -> List[str]:
+        return [self.save(data, extension) for data in renditions]
+
+    async def acquire(self, key: str, renditions: List[bytes], extension: str = ".webp") -> List[str]:
+        """
+        Add a reference to the photo key and store its renditions
+
+        Returns the rendition URLs in the given order. Hashing and writing run
+        in a thread. Call release(key) once the reference is dropped (or when
+        the media document referencing it could not be stored).
+        """
+        deadline = time.monotonic() + ACQUIRE_TIMEOUT_SECONDS
+        while True:
+            stale_before = datetime.now(timezone.utc) - timedelta(seconds=STALE_DELETE_SECONDS)
+            try:
+                await self.files.update_one(
+                    {
+                        "content_hash": key,
+                        "$or": [{"deleting_at": None}, {"deleting_at": {"$lt": stale_before}}]
+                    },
+                    {"$inc": {"refs": 1}, "$set": {"deleting_at": None}},
+                    upsert=True
+                )
+                break
+            except DuplicateKeyError:
+                # The last reference is being deleted; wait for its files to go
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(0.05)
+
+        try:
+            urls = await asyncio.to_thread(self._save_all, renditions, extension)
+            await self.files.update_one({"content_hash": key}, {"$addToSet": {"urls": {"$each": urls}}})
+        except BaseException:
+            await self.release(key)
+            raise
+
+        return urls
+
+    async def release(self, key: Optional[str]) -> None:
+        """Drop a reference to the photo key, deleting its files with the last one"""
+        if not key:
+            return
+
+        record = await self.files.find_one_and_update(
+            {"content_hash": key},
+            {"$inc": {"refs": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if record is None:
+            # Uploaded before reference counting; keep the files
+            return
+        if record['refs'] > 0:
+            return
+
+        claimed = await self.files.find_one_and_update(
+            {"content_hash": key, "refs": {"$lte": 0}, "deleting_at": None},
+            {"$set": {"deleting_at": datetime.now(timezone.utc)}},
+            return_document=ReturnDocument.AFTER
+        )
+        if claimed is None:
+            # Re-acquired (or claimed by another release) in the meantime
+            return
+
+        await asyncio.to_thread(self.delete_urls, claimed.get('urls', []))
+        await self.files.delete_one({"content_hash": key, "refs": {"$lte": 0}, "deleting_at": {"$ne": None}})
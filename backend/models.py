@@ -233,6 +233,7 @@ class Profile(BaseModel):
     expires_at: Optional[datetime] = None  # PHASE 12: Invitation expiry date (default: event_date + 7 days)
     is_template: bool = False  # Template flag - indicates if this profile is a reusable template
     is_active: bool = True
+    snapshot_version: int = 0  # Bumped by every write that re-publishes the public snapshots
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
@@ -510,6 +511,14 @@ class ProfileResponse(BaseModel):
     event_links: Optional[Dict[str, str]] = None  # PHASE 13: Event-specific links
 
 
+class MediaVariant(BaseModel):
+    """Resized rendition of an uploaded photo, for srcset selection"""
+    width: int
+    height: int
+    url: str
+    file_size: int
+
+
 class ProfileMedia(BaseModel):
     model_config = ConfigDict(extra="ignore")
     
@@ -519,12 +528,29 @@ class ProfileMedia(BaseModel):
     media_url: str
     caption: Optional[str] = None
     order: int = 0
-    is_cover: bool = False  # Mark as cover photo
+    is_cover: bool = False  # Derived from the profile's cover_photo_id when read
     file_size: Optional[int] = None  # Size in bytes
     original_filename: Optional[str] = None  # Original upload name
+    variants: List[MediaVariant] = []  # Uploaded photo renditions, ascending width
+    content_hash: Optional[str] = None  # SHA-256 of the stored full-size photo (uploaded photos only)
+    placeholder: Optional[str] = None  # Tiny blurred WebP data URI for blur-up loading
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class PhotoUploadResult(BaseModel):
+    """Outcome for one file of a batch photo upload"""
+    filename: Optional[str] = None
+    success: bool
+    media: Optional[ProfileMedia] = None
+    error: Optional[str] = None
+
+
+class BatchPhotoUploadResponse(BaseModel):
+    uploaded: int
+    failed: int
+    results: List[PhotoUploadResult]  # Same order as the uploaded files
+
+
 class ProfileMediaCreate(BaseModel):
     media_type: str
     media_url: str
@@ -742,7 +768,10 @@ class Analytics(BaseModel):
     first_viewed_at: Optional[datetime] = None
     last_viewed_at: Optional[datetime] = None
     
-    # Daily views (last 30 days)
+    # Daily views keyed by date, incremented atomically ({"2024-01-31": 12, ...})
+    daily_view_counts: Dict[str, int] = Field(default_factory=dict)
+    
+    # Legacy daily views list (last 30 days), merged with daily_view_counts on read
     daily_views: List[DailyView] = Field(default_factory=list)
     
     # Hourly distribution (0-23)
@@ -850,6 +879,9 @@ class RateLimit(BaseModel):
     count: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # End of the day window, set on insert by MongoRateLimiter; the expires_at_ttl
+    # index (indexes.py) deletes the counter once it passes
+    expires_at: Optional[datetime] = None
 
 
 class AuditLog(BaseModel):
@@ -875,3 +907,35 @@ class AuditLogResponse(BaseModel):
     details: Optional[Dict] = None
     timestamp: datetime
 
+
+
+class PdfExportRequest(BaseModel):
+    """Bulk PDF export: every profile in every requested language"""
+    profile_ids: List[str] = Field(..., min_length=1, max_length=200)
+    languages: List[str] = []  # Empty = each profile's enabled languages
+    
+    @field_validator('languages')
+    def validate_languages(cls, v):
+        allowed_languages = ['english', 'telugu', 'hindi', 'tamil', 'kannada', 'malayalam']
+        for lang in v:
+            if lang not in allowed_languages:
+                raise ValueError(f'Language must be one of: {", ".join(allowed_languages)}')
+        return list(dict.fromkeys(v))
+
+
+class PdfExportError(BaseModel):
+    profile_id: str
+    language: Optional[str] = None
+    error: str
+
+
+class PdfExportStatus(BaseModel):
+    """Progress of a bulk PDF export job"""
+    id: str
+    status: Literal["running", "completed", "failed"]
+    total: int
+    completed: int
+    failed: int
+    errors: List[PdfExportError] = []
+    created_at: datetime
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,229 @@
+"""
+Process-wide assets shared by every invitation PDF render
+
+Deity backgrounds are decoded, downscaled and JPEG-compressed once per
+process and kept as ready-to-draw ImageReaders, instead of being rebuilt on
+every page of every PDF. ReportLab embeds an image once per document, so
+multi-page PDFs reference a single image XObject.
+
+Indic script fonts are parsed and registered with ReportLab once per process.
+TrueType fonts are always embedded as subsets, so a PDF carries only the
+glyphs it actually draws rather than the whole Noto font file. Conjuncts and
+vowel signs are shaped by uharfbuzz when it is installed.
+"""
+import io
+import logging
+import os
+from pathlib import Path
+from typing import Dict, FrozenSet, NamedTuple, Optional, Set, Tuple
+
+from PIL import Image as PILImage
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+logger = logging.getLogger(__name__)
+
+# Map deity IDs to local file paths
+DEITY_BACKGROUND_FILES = {
+    'ganesha': '/app/frontend/public/assets/deities/ganesha_desktop.jpg',
+    'venkateswara_padmavati': '/app/frontend/public/assets/deities/venkateswara_padmavati_desktop.jpg',
+    'shiva_parvati': '/app/frontend/public/assets/deities/shiva_parvati_desktop.jpg',
+    'lakshmi_vishnu': '/app/frontend/public/assets/deities/lakshmi_vishnu_desktop.jpg'
+}
+
+# Backgrounds are downscaled to keep PDFs small
+DEITY_BACKGROUND_MAX_WIDTH = 800
+DEITY_BACKGROUND_QUALITY = 70
+DEITY_BACKGROUND_OPACITY = 0.12
+
+# Directory holding the Noto TTF files below; fetch them with fetch_pdf_fonts.py
+PDF_FONT_DIR = Path(os.environ.get('PDF_FONT_DIR', Path(__file__).parent / 'fonts'))
+
+# Language -> (regular, bold) font files; English uses the built-in Helvetica
+LANGUAGE_FONT_FILES: Dict[str, Tuple[str, str]] = {
+    'telugu': ('NotoSansTelugu-Regular.ttf', 'NotoSansTelugu-Bold.ttf'),
+    'hindi': ('NotoSansDevanagari-Regular.ttf', 'NotoSansDevanagari-Bold.ttf'),
+    'tamil': ('NotoSansTamil-Regular.ttf', 'NotoSansTamil-Bold.ttf'),
+    'kannada': ('NotoSansKannada-Regular.ttf', 'NotoSansKannada-Bold.ttf'),
+    'malayalam': ('NotoSansMalayalam-Regular.ttf', 'NotoSansMalayalam-Bold.ttf')
+}
+
+
+class LanguageFont(NamedTuple):
+    """Registered script font; charset lists the code points it has glyphs for"""
+    regular: str
+    bold: str
+    charset: FrozenSet[int]
+
+
+class DeityBackground(NamedTuple):
+    reader: ImageReader
+    width: int
+    height: int
+
+
+# deity_id -> prepared background (None when the image is missing or unreadable)
+_deity_backgrounds: Dict[str, Optional[DeityBackground]] = {}
+
+
+def _load_deity_background(path: str) -> DeityBackground:
+    img = PILImage.open(path)
+
+    if img.width > DEITY_BACKGROUND_MAX_WIDTH:
+        ratio = DEITY_BACKGROUND_MAX_WIDTH / img.width
+        img = img.resize((DEITY_BACKGROUND_MAX_WIDTH, int(img.height * ratio)), PILImage.Resampling.LANCZOS)
+
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    img_buffer = io.BytesIO()
+    img.save(img_buffer, format='JPEG', quality=DEITY_BACKGROUND_QUALITY, optimize=True)
+    img_buffer.seek(0)
+
+    return DeityBackground(ImageReader(img_buffer), img.width, img.height)
+
+
+def get_deity_background(deity_id: Optional[str]) -> Optional[DeityBackground]:
+    """Prepared background for a deity, loaded on first use and memoized per process"""
+    if not deity_id or deity_id == 'none':
+        return None
+
+    if deity_id not in _deity_backgrounds:
+        background = None
+        path = DEITY_BACKGROUND_FILES.get(deity_id)
+        if path and os.path.exists(path):
+            try:
+                background = _load_deity_background(path)
+            except Exception as e:
+                # If deity image fails, PDFs are rendered without it
+                logger.warning(f"Failed to load deity background {deity_id}: {e}")
+        _deity_backgrounds[deity_id] = background
+
+    return _deity_backgrounds[deity_id]
+
+
+def preload_deity_backgrounds() -> None:
+    """Prepare every deity background up front (e.g. at process start)"""
+    for deity_id in DEITY_BACKGROUND_FILES:
+        get_deity_background(deity_id)
+
+
+# language -> registered script font; only successful registrations are kept,
+# so fonts fetched while the process runs are picked up by the next render
+_language_fonts: Dict[str, LanguageFont] = {}
+_font_warnings_logged: Set[str] = set()
+
+
+def _warn_font_once(language: str, message: str) -> None:
+    if language not in _font_warnings_logged:
+        _font_warnings_logged.add(language)
+        logger.warning(message)
+
+
+def _register_language_font(language: str, regular_file: str, bold_file: str) -> LanguageFont:
+    family = f"PdfFont-{language}"
+    bold = f"{family}-Bold"
+
+    regular_path = PDF_FONT_DIR / regular_file
+    bold_path = PDF_FONT_DIR / bold_file
+    if not bold_path.exists():
+        # Bold is optional; fall back to the regular face
+        bold_path = regular_path
+
+    regular_font = TTFont(family, str(regular_path))
+    pdfmetrics.registerFont(regular_font)
+    pdfmetrics.registerFont(TTFont(bold, str(bold_path)))
+
+    # Lets <b> and bold styles resolve to the bold face
+    pdfmetrics.registerFontFamily(family, normal=family, bold=bold, italic=family, boldItalic=bold)
+    return LanguageFont(family, bold, frozenset(regular_font.face.charToGlyph))
+
+
+def get_language_font(language: str) -> Optional[LanguageFont]:
+    """Script font for a language (None when Helvetica is used), registered on first use"""
+    font = _language_fonts.get(language)
+    if font is not None:
+        return font
+
+    files = LANGUAGE_FONT_FILES.get(language)
+    if not files:
+        return None
+
+    if not (PDF_FONT_DIR / files[0]).exists():
+        _warn_font_once(
+            language,
+            f"PDF font {files[0]} not found in {PDF_FONT_DIR} (run fetch_pdf_fonts.py); "
+            f"{language} PDFs use Helvetica"
+        )
+        return None
+
+    try:
+        font = _register_language_font(language, *files)
+    except Exception as e:
+        _warn_font_once(language, f"Failed to register PDF font for {language}: {e}")
+        return None
+
+    _language_fonts[language] = font
+    return font
+
+
+def language_font_version(language: str) -> str:
+    """
+    Identity of the font files a language renders with, for PDF cache keys
+
+    Empty for languages drawn in Helvetica anyway, "fallback" when the script
+    font is missing, otherwise the file names with their modification times.
+    A PDF rendered before the fonts were fetched or replaced is never reused.
+    """
+    files = LANGUAGE_FONT_FILES.get(language)
+    if not files:
+        return ""
+
+    parts = []
+    for filename in files:
+        try:
+            parts.append(f"{filename}@{(PDF_FONT_DIR / filename).stat().st_mtime_ns}")
+        except OSError:
+            if filename == files[0]:
+                return "fallback"
+    return ",".join(parts)
+
+
+def preload_pdf_assets() -> None:
+    """Prepare deity backgrounds and register language fonts up front (e.g. in PDF workers)"""
+    preload_deity_backgrounds()
+    for language in LANGUAGE_FONT_FILES:
+        get_language_font(language)
+
+
+def draw_deity_background(canvas_obj, background: DeityBackground) -> None:
+    """Draw a deity background centered on an A4 page with very light opacity"""
+    page_width, page_height = A4
+
+    # Scale to fit page while maintaining aspect ratio
+    scale = min(page_width / background.width, page_height / background.height)
+    scaled_width = background.width * scale
+    scaled_height = background.height * scale
+
+    # Center on page
+    x = (page_width - scaled_width) / 2
+    y = (page_height - scaled_height) / 2
+
+    canvas_obj.saveState()
+    try:
+        canvas_obj.setFillAlpha(DEITY_BACKGROUND_OPACITY)
+        canvas_obj.drawImage(
+            background.reader,
+            x, y,
+            width=scaled_width,
+            height=scaled_height,
+            preserveAspectRatio=True,
+            mask='auto'
+        )
+    except Exception as e:
+        # If deity image fails, continue without it
+        logger.warning(f"Failed to add deity background: {e}")
+    finally:
+        canvas_obj.restoreState()
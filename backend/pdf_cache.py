@@ -0,0 +1,90 @@
+"""
+Cache of rendered invitation PDFs
+
+Entries are keyed by everything the rendered document depends on (profile
+id, profile updated_at, design, language, the language's font files and
+PDF_RENDER_VERSION), so a stale
+PDF can never be served; invalidate_profile() only reclaims space early.
+
+Tiers:
+    memory: per-worker LRU bounded by total bytes
+    disk:   optional directory (PDF_CACHE_DIR) shared by workers and restarts
+"""
+import asyncio
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from byte_cache import ByteCache
+
+# Bump when PDF layout/rendering changes so disk-cached documents are not reused
+PDF_RENDER_VERSION = 3
+
+
+def pdf_cache_key(profile_id: str, updated_at, design_id: Optional[str], language: str, font_version: str) -> str:
+    """Version key of a rendered PDF (font_version from pdf_assets.language_font_version)"""
+    raw = f"{PDF_RENDER_VERSION}|{profile_id}|{updated_at}|{design_id}|{language}|{font_version}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+class PdfCache:
+    """
+    Two-tier PDF cache
+
+    Entries are stored as <profile id>/<key>.pdf, and memory entries are
+    indexed by profile so invalidate_profile() does not scan the whole tier.
+
+    Args:
+        max_bytes: Memory tier budget (0 disables the memory tier)
+        disk_dir: Directory for the disk tier (None disables it)
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[Path] = None):
+        self._profile_keys: Dict[str, Set[str]] = {}
+        self._store = ByteCache(
+            "PDF", max_bytes, disk_dir,
+            on_remember=self._index, on_forget=self._unindex
+        )
+
+    def _index(self, entry_key: str) -> None:
+        self._profile_keys.setdefault(entry_key.split("/", 1)[0], set()).add(entry_key)
+
+    def _unindex(self, entry_key: str) -> None:
+        profile_id = entry_key.split("/", 1)[0]
+        keys = self._profile_keys.get(profile_id)
+        if keys is not None:
+            keys.discard(entry_key)
+            if not keys:
+                del self._profile_keys[profile_id]
+
+    @staticmethod
+    def _check_profile_id(profile_id: str) -> str:
+        # Profile ids are UUIDs; refuse anything that could escape disk_dir
+        if not profile_id or profile_id.startswith(".") or "/" in profile_id or os.sep in profile_id:
+            raise ValueError(f"Invalid profile id for PDF cache: {profile_id!r}")
+        return profile_id
+
+    def _entry_key(self, profile_id: str, key: str) -> str:
+        return f"{self._check_profile_id(profile_id)}/{key}.pdf"
+
+    async def get(self, profile_id: str, key: str) -> Optional[bytes]:
+        """Return cached PDF bytes or None"""
+        return await self._store.get(self._entry_key(profile_id, key))
+
+    async def set(self, profile_id: str, key: str, data: bytes) -> None:
+        """Store PDF bytes in every enabled tier"""
+        await self._store.set(self._entry_key(profile_id, key), data)
+
+    async def invalidate_profile(self, profile_id: Optional[str]) -> None:
+        """Drop every cached PDF of a profile"""
+        if profile_id is None:
+            return
+
+        for entry_key in list(self._profile_keys.get(profile_id, ())):
+            self._store.forget(entry_key)
+
+        if self._store.disk_dir is not None:
+            profile_dir = self._store.disk_dir / self._check_profile_id(profile_id)
+            await asyncio.to_thread(shutil.rmtree, profile_dir, True)
@@ -0,0 +1,209 @@
+"""
+Bulk invitation PDF export jobs
+
+A job renders every (profile, language) pair through a caller-supplied render
+coroutine (the PDF worker pool plus cache). One semaphore per manager bounds
+renders in flight across all jobs, so concurrent exports never take more of
+the pool than that and interactive downloads keep the rest. Each
+finished PDF is written to the job's temporary directory, and the ZIP download
+streams entries in completion order, so it can start while rendering is still
+in progress.
+
+Jobs live in the memory of the server process that created them and are
+discarded (with their files) job_ttl_seconds after they finish.
+"""
+import asyncio
+import logging
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+RenderFunc = Callable[[dict, str], Awaitable[bytes]]
+
+
+class _ZipSink:
+    """Write-only file object collecting ZIP output between yields"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class PdfExportJob:
+    """State of one bulk export"""
+
+    def __init__(self, items: List[Tuple[dict, str]], errors: List[dict]):
+        self.id = str(uuid.uuid4())
+        self.items = items
+        self.total = len(items) + len(errors)
+        self.errors = errors  # {"profile_id", "language", "error"}
+        self.files: List[Tuple[str, Path]] = []  # (zip entry name, rendered file) in completion order
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.finished_monotonic: Optional[float] = None
+        self.directory = Path(tempfile.mkdtemp(prefix=f"pdf_export_{self.id}_"))
+        self.task: Optional[asyncio.Task] = None
+        self._progress = asyncio.Condition()
+        self._next_file_index = 0
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def status(self) -> dict:
+        if not self.done:
+            status = "running"
+        elif self.files:
+            status = "completed"
+        else:
+            status = "failed"
+        return {
+            "id": self.id,
+            "status": status,
+            "total": self.total,
+            "completed": len(self.files),
+            "failed": len(self.errors),
+            "errors": self.errors,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    async def _notify(self) -> None:
+        async with self._progress:
+            self._progress.notify_all()
+
+    async def wait_for_progress(self, seen_files: int) -> None:
+        """Wait until more files are available or the job finishes"""
+        async with self._progress:
+            await self._progress.wait_for(lambda: len(self.files) > seen_files or self.done)
+
+    async def add_file(self, name: str, data: bytes) -> None:
+        # Reserve the file name before awaiting: concurrent add_file calls must not share it
+        path = self.directory / f"{self._next_file_index}.pdf"
+        self._next_file_index += 1
+        await asyncio.to_thread(path.write_bytes, data)
+        self.files.append((name, path))
+        await self._notify()
+
+    async def finish(self) -> None:
+        self.finished_at = datetime.now(timezone.utc)
+        self.finished_monotonic = time.monotonic()
+        await self._notify()
+
+    def cleanup(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class PdfExportManager:
+    """
+    Registry and runner of bulk export jobs
+
+    Args:
+        render: Coroutine producing PDF bytes for (profile, language)
+        concurrency: Renders in flight across all jobs; keep it below the
+            pool's max_pending so interactive downloads always have room
+        job_ttl_seconds: How long finished jobs stay downloadable
+    """
+
+    def __init__(self, render: RenderFunc, concurrency: int = 2, job_ttl_seconds: float = 3600):
+        self.render = render
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.job_ttl_seconds = job_ttl_seconds
+        self._jobs: Dict[str, PdfExportJob] = {}
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.done and now - job.finished_monotonic > self.job_ttl_seconds:
+                job.cleanup()
+                del self._jobs[job_id]
+
+    def create(self, items: List[Tuple[dict, str]], errors: List[dict]) -> PdfExportJob:
+        """Register a job for (profile, language) items and start rendering"""
+        self._purge_expired()
+        job = PdfExportJob(items, errors)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[PdfExportJob]:
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def _render_item(self, job: PdfExportJob, profile: dict, language: str) -> None:
+        async with self._semaphore:
+            while True:
+                try:
+                    data = await self.render(profile, language)
+                    break
+                except HTTPException as e:
+                    if e.status_code == 503:
+                        # Pool saturated by interactive downloads; wait for a slot
+                        await asyncio.sleep(1)
+                        continue
+                    job.errors.append({"profile_id": profile['id'], "language": language, "error": str(e.detail)})
+                    return
+                except Exception as e:
+                    logger.error(f"PDF export {job.id} failed for {profile['id']}/{language}: {e}")
+                    job.errors.append({"profile_id": profile['id'], "language": language, "error": "Rendering failed"})
+                    return
+
+        await job.add_file(f"{profile['slug']}-{language}.pdf", data)
+
+    async def _run(self, job: PdfExportJob) -> None:
+        try:
+            await asyncio.gather(*(
+                self._render_item(job, profile, language)
+                for profile, language in job.items
+            ))
+        finally:
+            await job.finish()
+
+    async def stream_zip(self, job: PdfExportJob) -> AsyncIterator[bytes]:
+        """Yield a ZIP of the job's PDFs, adding entries as renders complete"""
+        sink = _ZipSink()
+        # Unseekable sink: zipfile writes data descriptors instead of seeking back
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            written = 0
+            while True:
+                while written < len(job.files):
+                    name, path = job.files[written]
+                    data = await asyncio.to_thread(path.read_bytes)
+                    archive.writestr(name, data)
+                    written += 1
+                    yield sink.drain()
+
+                if job.done and written == len(job.files):
+                    break
+                await job.wait_for_progress(written)
+
+        # Central directory
+        yield sink.drain()
+
+    def shutdown(self) -> None:
+        for job in self._jobs.values():
+            job.cleanup()
+        self._jobs.clear()
@@ -0,0 +1,375 @@
+"""
+Invitation PDF rendering (ReportLab)
+
+Everything here is synchronous CPU work with no database access, so it can
+run inside worker processes; profile documents go in, PDF bytes come out.
+"""
+import io
+import re
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, NamedTuple, Optional
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib import colors as rl_colors
+
+from pdf_assets import LanguageFont, get_deity_background, draw_deity_background, get_language_font
+
+
+# Design theme color mappings for PDF
+THEME_COLORS = {
+    'temple_divine': {'primary': (139, 115, 85), 'secondary': (212, 175, 55), 'text': (74, 55, 40), 'bg': (255, 248, 231)},
+    'royal_classic': {'primary': (139, 0, 0), 'secondary': (255, 215, 0), 'text': (74, 26, 26), 'bg': (255, 245, 230)},
+    'floral_soft': {'primary': (255, 182, 193), 'secondary': (255, 218, 185), 'text': (107, 78, 113), 'bg': (255, 240, 245)},
+    'cinematic_luxury': {'primary': (26, 26, 26), 'secondary': (212, 175, 55), 'text': (245, 245, 245), 'bg': (44, 44, 44)},
+    'heritage_scroll': {'primary': (139, 90, 43), 'secondary': (205, 133, 63), 'text': (74, 48, 23), 'bg': (250, 240, 230)},
+    'minimal_elegant': {'primary': (128, 128, 128), 'secondary': (169, 169, 169), 'text': (64, 64, 64), 'bg': (255, 255, 255)},
+    'modern_premium': {'primary': (47, 79, 79), 'secondary': (72, 209, 204), 'text': (245, 245, 245), 'bg': (32, 32, 32)},
+    'artistic_handcrafted': {'primary': (160, 82, 45), 'secondary': (210, 180, 140), 'text': (101, 67, 33), 'bg': (255, 250, 240)}
+}
+
+# Language templates for PDF
+LANGUAGE_TEMPLATES = {
+    'english': {
+        'opening_title': 'Wedding Invitation',
+        'couple_label': 'Join us in celebrating the union of',
+        'events_title': 'Event Schedule',
+        'date_label': 'Date',
+        'time_label': 'Time',
+        'venue_label': 'Venue',
+        'contact_title': 'Contact Information',
+        'groom_label': 'Groom',
+        'bride_label': 'Bride'
+    },
+    'telugu': {
+        'opening_title': 'వివాహ ఆహ్వానం',
+        'couple_label': 'మా వివాహ వేడుకలో పాల్గొనండి',
+        'events_title': 'కార్యక్రమ షెడ్యూల్',
+        'date_label': 'తేదీ',
+        'time_label': 'సమయం',
+        'venue_label': 'స్థలం',
+        'contact_title': 'సంప్రదించండి',
+        'groom_label': 'వరుడు',
+        'bride_label': 'వధువు'
+    },
+    'hindi': {
+        'opening_title': 'विवाह निमंत्रण',
+        'couple_label': 'हमारे विवाह समारोह में शामिल हों',
+        'events_title': 'कार्यक्रम कार्यक्रम',
+        'date_label': 'तारीख',
+        'time_label': 'समय',
+        'venue_label': 'स्थान',
+        'contact_title': 'संपर्क जानकारी',
+        'groom_label': 'वर',
+        'bride_label': 'वधू'
+    },
+    'tamil': {
+        'opening_title': 'திருமண அழைப்பிதழ்',
+        'couple_label': 'எங்கள் திருமண நிகழ்வில் சேரவும்',
+        'events_title': 'நிகழ்வு அட்டவணை',
+        'date_label': 'தேதி',
+        'time_label': 'நேரம்',
+        'venue_label': 'இடம்',
+        'contact_title': 'தொடர்பு தகவல்',
+        'groom_label': 'மணமகன்',
+        'bride_label': 'மணமகள்'
+    },
+    'kannada': {
+        'opening_title': 'ಮದುವೆ ಆಮಂತ್ರಣ',
+        'couple_label': 'ನಮ್ಮ ಮದುವೆ ಸಮಾರಂಭದಲ್ಲಿ ಸೇರಿ',
+        'events_title': 'ಕಾರ್ಯಕ್ರಮದ ವೇಳಾಪಟ್ಟಿ',
+        'date_label': 'ದಿನಾಂಕ',
+        'time_label': 'ಸಮಯ',
+        'venue_label': 'ಸ್ಥಳ',
+        'contact_title': 'ಸಂಪರ್ಕ ಮಾಹಿತಿ',
+        'groom_label': 'ವರ',
+        'bride_label': 'ವಧು'
+    },
+    'malayalam': {
+        'opening_title': 'വിവാഹ ക്ഷണം',
+        'couple_label': 'ഞങ്ങളുടെ വിവാഹ ചടങ്ങിൽ പങ്കെടുക്കൂ',
+        'events_title': 'പരിപാടി ഷെഡ്യൂൾ',
+        'date_label': 'തീയതി',
+        'time_label': 'സമയം',
+        'venue_label': 'സ്ഥലം',
+        'contact_title': 'ബന്ധപ്പെടുക',
+        'groom_label': 'വരൻ',
+        'bride_label': 'വധു'
+    }
+}
+
+# Paragraph markup tags and entities, left untouched by fallback_markup()
+MARKUP_TOKEN_RE = re.compile(r'(<[^>]*>|&#?\w+;)')
+
+
+def get_theme_colors(design_id: str):
+    """Get theme colors for PDF generation"""
+    return THEME_COLORS.get(design_id, THEME_COLORS['royal_classic'])
+
+
+def get_language_text(language: str):
+    """Get language-specific text for PDF"""
+    return LANGUAGE_TEMPLATES.get(language, LANGUAGE_TEMPLATES['english'])
+
+
+def rgb_to_reportlab_color(rgb_tuple):
+    """Convert RGB tuple to ReportLab color"""
+    r, g, b = rgb_tuple
+    return rl_colors.Color(r/255.0, g/255.0, b/255.0)
+
+
+class PdfTemplate(NamedTuple):
+    """Styles and strings for one (design, language) pair, shared by every render"""
+    text: Dict[str, str]
+    font: Optional[LanguageFont]
+    title_style: ParagraphStyle
+    heading_style: ParagraphStyle
+    subheading_style: ParagraphStyle
+    body_style: ParagraphStyle
+    center_body_style: ParagraphStyle
+    event_name_style: ParagraphStyle
+
+
+def fallback_markup(text: str, font: Optional[LanguageFont], bold: bool = False) -> str:
+    """
+    Wrap runs of characters the script font has no glyphs for in Helvetica
+    
+    Noto script fonts carry digits and punctuation but no Latin letters, and
+    ReportLab has no per-glyph font fallback, so Latin names and venues in a
+    Telugu PDF are switched to Helvetica explicitly. <font face> resets bold,
+    so bold contexts must pass bold=True.
+    """
+    if font is None or not text:
+        return text
+    
+    face = 'Helvetica-Bold' if bold else 'Helvetica'
+    parts = []
+    for token in MARKUP_TOKEN_RE.split(text):
+        if MARKUP_TOKEN_RE.fullmatch(token):
+            parts.append(token)
+            continue
+        for covered, run in groupby(token, key=lambda ch: ch.isspace() or ord(ch) in font.charset):
+            run = ''.join(run)
+            parts.append(run if covered else f'<font face="{face}">{run}</font>')
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=None)
+def _compile_pdf_template(design_id: str, language: str, font: Optional[LanguageFont]) -> PdfTemplate:
+    # Get theme colors and language text
+    theme = get_theme_colors(design_id)
+    lang_text = get_language_text(language)
+    
+    # Script languages use their Noto font for whole paragraphs so uharfbuzz
+    # can shape conjuncts (ReportLab only shapes when the style font is a TTF)
+    regular_font = font.regular if font else 'Helvetica'
+    bold_font = font.bold if font else 'Helvetica-Bold'
+    shaping = 1 if font else 0
+    
+    # Convert colors
+    primary_color = rgb_to_reportlab_color(theme['primary'])
+    secondary_color = rgb_to_reportlab_color(theme['secondary'])
+    text_color = rgb_to_reportlab_color(theme['text'])
+    
+    # Define styles
+    styles = getSampleStyleSheet()
+    
+    # Title style
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=28,
+        textColor=primary_color,
+        spaceAfter=20,
+        alignment=TA_CENTER,
+        fontName=bold_font,
+        shaping=shaping
+    )
+    
+    # Heading style
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=18,
+        textColor=secondary_color,
+        spaceAfter=12,
+        spaceBefore=20,
+        alignment=TA_CENTER,
+        fontName=bold_font,
+        shaping=shaping
+    )
+    
+    # Subheading style
+    subheading_style = ParagraphStyle(
+        'CustomSubHeading',
+        parent=styles['Heading3'],
+        fontSize=14,
+        textColor=primary_color,
+        spaceAfter=8,
+        alignment=TA_CENTER,
+        fontName=bold_font,
+        shaping=shaping
+    )
+    
+    # Body style
+    body_style = ParagraphStyle(
+        'CustomBody',
+        parent=styles['Normal'],
+        fontSize=11,
+        textColor=text_color,
+        spaceAfter=6,
+        alignment=TA_LEFT,
+        fontName=regular_font,
+        shaping=shaping
+    )
+    
+    # Center body style
+    center_body_style = ParagraphStyle(
+        'CustomCenterBody',
+        parent=body_style,
+        alignment=TA_CENTER
+    )
+    
+    # Event name style
+    event_name_style = ParagraphStyle(
+        'EventName',
+        parent=subheading_style,
+        fontSize=14,
+        textColor=primary_color,
+        alignment=TA_LEFT
+    )
+    
+    return PdfTemplate(
+        text=lang_text,
+        font=font,
+        title_style=title_style,
+        heading_style=heading_style,
+        subheading_style=subheading_style,
+        body_style=body_style,
+        center_body_style=center_body_style,
+        event_name_style=event_name_style
+    )
+
+
+def get_pdf_template(design_id: Optional[str], language: str) -> PdfTemplate:
+    """Compiled template for a design and language, built once per process"""
+    # Unknown values fall back to defaults; normalizing keeps the memo bounded
+    design_id = design_id if design_id in THEME_COLORS else 'royal_classic'
+    language = language if language in LANGUAGE_TEMPLATES else 'english'
+    # The font is part of the memo key, so fonts fetched later get a fresh template
+    return _compile_pdf_template(design_id, language, get_language_font(language))
+
+
+def generate_invitation_pdf(profile: dict, language: str = 'english') -> bytes:
+    """
+    Generate PDF invitation from profile data
+    
+    Pure CPU work; runs in the PDF worker pool (see render_invitation_pdf in server.py).
+    Only the profile-specific flowables are built here; styles come from the
+    memoized template.
+    """
+    buffer = io.BytesIO()
+    
+    template = get_pdf_template(profile.get('design_id', 'royal_classic'), language)
+    lang_text = template.text
+    font = template.font
+    title_style = template.title_style
+    heading_style = template.heading_style
+    body_style = template.body_style
+    center_body_style = template.center_body_style
+    
+    # Deity background is prepared once per process and reused by every page
+    deity_background = get_deity_background(profile.get('deity_id'))
+    
+    # Create PDF document
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        topMargin=0.75*inch,
+        bottomMargin=0.75*inch
+    )
+    
+    # Container for PDF elements
+    story = []
+    
+    # Add title
+    story.append(Paragraph(fallback_markup(lang_text['opening_title'], font, bold=True), title_style))
+    story.append(Spacer(1, 0.3*inch))
+    
+    # Add couple names
+    story.append(Paragraph(fallback_markup(lang_text['couple_label'], font), center_body_style))
+    story.append(Spacer(1, 0.2*inch))
+    
+    couple_text = f"<b>{profile['groom_name']}</b> & <b>{profile['bride_name']}</b>"
+    story.append(Paragraph(fallback_markup(couple_text, font, bold=True), heading_style))
+    story.append(Spacer(1, 0.4*inch))
+    
+    # Add events section
+    events = profile.get('events', [])
+    visible_events = [e for e in events if e.get('visible', True)]
+    
+    if visible_events:
+        story.append(Paragraph(fallback_markup(lang_text['events_title'], font, bold=True), heading_style))
+        story.append(Spacer(1, 0.2*inch))
+        
+        # Sort events by date
+        sorted_events = sorted(visible_events, key=lambda x: x.get('date', ''))
+        
+        for event in sorted_events:
+            # Event name
+            story.append(Paragraph(fallback_markup(f"<b>{event['name']}</b>", font, bold=True), template.event_name_style))
+            story.append(Spacer(1, 0.1*inch))
+            
+            # Event details
+            date_str = event.get('date', '')
+            time_str = event.get('start_time', '')
+            if event.get('end_time'):
+                time_str += f" - {event['end_time']}"
+            
+            story.append(Paragraph(f"<b>{lang_text['date_label']}:</b> {fallback_markup(date_str, font)}", body_style))
+            story.append(Paragraph(f"<b>{lang_text['time_label']}:</b> {fallback_markup(time_str, font)}", body_style))
+            story.append(Paragraph(f"<b>{lang_text['venue_label']}:</b> {fallback_markup(event.get('venue_name', ''), font)}", body_style))
+            story.append(Paragraph(fallback_markup(f"{event.get('venue_address', '')}", font), body_style))
+            
+            if event.get('description'):
+                story.append(Spacer(1, 0.05*inch))
+                story.append(Paragraph(fallback_markup(event['description'], font), body_style))
+            
+            story.append(Spacer(1, 0.25*inch))
+    
+    # Add contact information
+    if profile.get('whatsapp_groom') or profile.get('whatsapp_bride'):
+        story.append(Spacer(1, 0.3*inch))
+        story.append(Paragraph(fallback_markup(lang_text['contact_title'], font, bold=True), heading_style))
+        story.append(Spacer(1, 0.15*inch))
+        
+        if profile.get('whatsapp_groom'):
+            story.append(Paragraph(
+                f"<b>{lang_text['groom_label']}:</b> {fallback_markup(profile['whatsapp_groom'], font)}", 
+                body_style
+            ))
+        
+        if profile.get('whatsapp_bride'):
+            story.append(Paragraph(
+                f"<b>{lang_text['bride_label']}:</b> {fallback_markup(profile['whatsapp_bride'], font)}", 
+                body_style
+            ))
+    
+    # Build PDF with deity background if present
+    if deity_background:
+        def add_deity_background(canvas_obj, doc_obj):
+            """Add deity background with very light opacity"""
+            draw_deity_background(canvas_obj, deity_background)
+        
+        doc.build(story, onFirstPage=add_deity_background, onLaterPages=add_deity_background)
+    else:
+        doc.build(story)
+    
+    # Get PDF data
+    return buffer.getvalue()
@@ -0,0 +1,207 @@
+"""
+QR code rendering and cache
+
+A QR image is a pure function of the encoded URL, format and size, so every
+variant is rendered at most once per process and kept in a byte-bounded LRU.
+An optional disk tier (QR_CACHE_DIR) shares renders between workers and
+restarts. Keys include QR_RENDER_VERSION, so changing the rendering below
+never serves old images.
+
+render_qr_sheet() lays out many codes on printable A4 pages in one pass.
+"""
+import asyncio
+import hashlib
+import io
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import qrcode
+from PIL import Image
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+
+from byte_cache import ByteCache
+
+# Bump when QR rendering changes so disk-cached images are not reused
+QR_RENDER_VERSION = 1
+
+QR_MEDIA_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml'
+}
+QR_SIZES = (256, 512, 1024)
+QR_DEFAULT_SIZE = 512
+QR_BORDER = 4  # quiet zone in modules, the minimum the QR spec allows
+
+
+def qr_matrix(data: str) -> List[List[bool]]:
+    """Module matrix of the smallest QR code holding data, quiet zone included"""
+    qr = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=QR_BORDER,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def qr_image(data: str, size: int) -> Image.Image:
+    """Black and white size x size QR image with whole-pixel modules"""
+    matrix = qr_matrix(data)
+    modules = len(matrix)
+    img = Image.new('1', (modules, modules), 1)
+    img.putdata([0 if dark else 1 for row in matrix for dark in row])
+
+    # Scale by a whole factor so modules stay sharp, then pad to the exact size
+    # (QR_SIZES are all larger than the biggest QR code, 177 + 2 * QR_BORDER modules)
+    scale = max(1, size // modules)
+    img = img.resize((modules * scale, modules * scale), Image.Resampling.NEAREST)
+    if img.width >= size:
+        return img
+    canvas = Image.new('1', (size, size), 1)
+    offset = (size - img.width) // 2
+    canvas.paste(img, (offset, offset))
+    return canvas
+
+
+def _render_png(data: str, size: int) -> bytes:
+    buffer = io.BytesIO()
+    qr_image(data, size).save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def _render_svg(data: str, size: int) -> bytes:
+    matrix = qr_matrix(data)
+    modules = len(matrix)
+
+    # One horizontal run per path segment keeps the SVG small
+    path = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < modules:
+            if row[x]:
+                start = x
+                while x < modules and row[x]:
+                    x += 1
+                path.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+            else:
+                x += 1
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+        f'<rect width="{modules}" height="{modules}" fill="#fff"/>'
+        f'<path d="{"".join(path)}" fill="#000"/>'
+        f'</svg>'
+    ).encode()
+
+
+def render_qr_code(data: str, format: str = 'png', size: int = QR_DEFAULT_SIZE) -> bytes:
+    """Encode data as a QR code image (format 'png' or 'svg')"""
+    if format == 'svg':
+        return _render_svg(data, size)
+    return _render_png(data, size)
+
+
+# QR sheet layout: a 2 x 3 grid of codes per A4 page
+QR_SHEET_COLUMNS = 2
+QR_SHEET_ROWS = 3
+QR_SHEET_MARGIN = 0.6 * inch
+QR_SHEET_TITLE_HEIGHT = 0.5 * inch
+QR_SHEET_LABEL_HEIGHT = 0.55 * inch
+
+
+def _draw_qr(canvas_obj, data: str, x: float, y: float, size: float) -> None:
+    # Vector modules, one rectangle per horizontal run, so print size is unlimited
+    matrix = qr_matrix(data)
+    module = size / len(matrix)
+    path = canvas_obj.beginPath()
+    for row_index, row in enumerate(matrix):
+        top = y + size - (row_index + 1) * module
+        col = 0
+        while col < len(row):
+            if row[col]:
+                start = col
+                while col < len(row) and row[col]:
+                    col += 1
+                path.rect(x + start * module, top, (col - start) * module, module)
+            else:
+                col += 1
+    canvas_obj.drawPath(path, stroke=0, fill=1)
+
+
+def render_qr_sheet(title: str, entries: List[Tuple[str, str]]) -> bytes:
+    """
+    Printable A4 PDF of labelled QR codes
+
+    Args:
+        title: Heading repeated on every page
+        entries: (label, url) pairs, drawn left to right, top to bottom
+    """
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle(title)
+    page_width, page_height = A4
+
+    cell_width = (page_width - 2 * QR_SHEET_MARGIN) / QR_SHEET_COLUMNS
+    cell_height = (page_height - 2 * QR_SHEET_MARGIN - QR_SHEET_TITLE_HEIGHT) / QR_SHEET_ROWS
+    qr_size = min(cell_width, cell_height - QR_SHEET_LABEL_HEIGHT) * 0.9
+    per_page = QR_SHEET_COLUMNS * QR_SHEET_ROWS
+
+    for index, (label, url) in enumerate(entries):
+        slot = index % per_page
+        if slot == 0:
+            if index:
+                pdf.showPage()
+            pdf.setFont('Helvetica-Bold', 16)
+            pdf.drawCentredString(page_width / 2, page_height - QR_SHEET_MARGIN - 16, title)
+
+        column, row = slot % QR_SHEET_COLUMNS, slot // QR_SHEET_COLUMNS
+        cell_x = QR_SHEET_MARGIN + column * cell_width
+        cell_top = page_height - QR_SHEET_MARGIN - QR_SHEET_TITLE_HEIGHT - row * cell_height
+        center_x = cell_x + cell_width / 2
+        qr_y = cell_top - qr_size
+
+        _draw_qr(pdf, url, center_x - qr_size / 2, qr_y, qr_size)
+
+        pdf.setFont('Helvetica-Bold', 12)
+        pdf.drawCentredString(center_x, qr_y - 16, label)
+        pdf.setFont('Helvetica', 8)
+        pdf.drawCentredString(center_x, qr_y - 30, url)
+
+    pdf.save()
+    return buffer.getvalue()
+
+
+class QrCodeStore:
+    """
+    Memoized QR code images
+
+    Args:
+        max_bytes: Memory tier budget
+        disk_dir: Directory for the disk tier (None disables it)
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, disk_dir: Optional[Path] = None):
+        self._store = ByteCache("QR", max_bytes, disk_dir)
+
+    @staticmethod
+    def _key(data: str, format: str, size: int) -> str:
+        raw = f"{QR_RENDER_VERSION}|{data}|{format}|{size}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    async def get(self, data: str, format: str = 'png', size: int = QR_DEFAULT_SIZE) -> bytes:
+        """QR image for data, rendered on first request"""
+        key = f"{self._key(data, format, size)}.{format}"
+        image = await self._store.get(key)
+        if image is None:
+            image = await asyncio.to_thread(render_qr_code, data, format, size)
+            await self._store.set(key, image)
+        return image
+
+    async def warm(self, data: str) -> None:
+        """Render every format and size of a QR code ahead of the first request"""
+        for format in QR_MEDIA_TYPES:
+            for size in QR_SIZES:
+                await self.get(data, format, size)
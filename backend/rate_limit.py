@@ -0,0 +1,116 @@
+"""
+Pluggable rate limiting for public submission endpoints (RSVPs, wishes)
+
+Backends:
+    memory: per-process sliding window keyed by (IP, endpoint). Default;
+            exact within one worker, no database round trip.
+    mongo:  shared per-UTC-day counters in the rate_limits collection,
+            incremented atomically with $inc and expired by a TTL index.
+            Use when running several workers behind one address.
+"""
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, NamedTuple, Tuple
+
+from pymongo import ReturnDocument
+
+# Limits are expressed per day
+WINDOW_SECONDS = 24 * 60 * 60
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: int = 0  # Seconds until the next request would be allowed
+
+
+class RateLimiter(ABC):
+    """Base class for rate limiter backends"""
+
+    @abstractmethod
+    async def hit(self, ip_address: str, endpoint: str, limit: int) -> RateLimitResult:
+        """Record a request and report whether it is within limit"""
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """
+    Sliding-window limiter holding recent request timestamps per key
+
+    At most `limit` timestamps are kept per key and the least recently used
+    keys are evicted beyond max_keys, so memory stays bounded.
+    """
+
+    def __init__(self, window_seconds: int = WINDOW_SECONDS, max_keys: int = 100_000):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._hits: "OrderedDict[Tuple[str, str], Deque[float]]" = OrderedDict()
+
+    async def hit(self, ip_address: str, endpoint: str, limit: int) -> RateLimitResult:
+        now = time.monotonic()
+        key = (ip_address, endpoint)
+
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque()
+        self._hits.move_to_end(key)
+
+        # Drop requests that left the window
+        while hits and hits[0] <= now - self.window_seconds:
+            hits.popleft()
+
+        if len(hits) >= limit:
+            return RateLimitResult(False, max(1, math.ceil(hits[0] + self.window_seconds - now)))
+
+        hits.append(now)
+
+        while len(self._hits) > self.max_keys:
+            self._hits.popitem(last=False)
+
+        return RateLimitResult(True)
+
+
+class MongoRateLimiter(RateLimiter):
+    """Fixed UTC-day counters shared by all workers through MongoDB"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def hit(self, ip_address: str, endpoint: str, limit: int) -> RateLimitResult:
+        now = datetime.now(timezone.utc)
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        day_end = day_start + timedelta(seconds=WINDOW_SECONDS)
+
+        # Single atomic round trip: create or increment today's counter
+        record = await self.db.rate_limits.find_one_and_update(
+            {"ip_address": ip_address, "endpoint": endpoint, "date": day_start.strftime("%Y-%m-%d")},
+            {
+                "$inc": {"count": 1},
+                "$set": {"updated_at": now.isoformat()},
+                "$setOnInsert": {
+                    "id": str(uuid.uuid4()),
+                    "created_at": now.isoformat(),
+                    # BSON date so the TTL index can purge finished windows
+                    "expires_at": day_end
+                }
+            },
+            projection={"_id": 0, "count": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+        if record['count'] > limit:
+            return RateLimitResult(False, max(1, math.ceil((day_end - now).total_seconds())))
+
+        return RateLimitResult(True)
+
+
+def create_rate_limiter(backend: str, db) -> RateLimiter:
+    """Build the configured rate limiter backend ("memory" or "mongo")"""
+    if backend == "mongo":
+        return MongoRateLimiter(db)
+    if backend == "memory":
+        return InMemoryRateLimiter()
+    raise ValueError(f"Unknown rate limit backend: {backend}")
@@ -1,10 +1,12 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Request
-from fastapi.responses import StreamingResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Form, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
 import os
+import asyncio
 import logging
 from pathlib import Path
 from typing import List, Optional, Dict
@@ -12,41 +14,48 @@ from datetime import datetime, timedelta, timezone
 import re
 import random
 import string
-import io
 import shutil
 import bleach
 import uuid
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage
-from reportlab.lib import colors as rl_colors
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
 import urllib.request
-from PIL import Image as PILImage
-import qrcode
 from icalendar import Calendar, Event as ICalEvent
-from io import BytesIO
 
 from models import (
     Admin, AdminLogin, AdminResponse,
     Profile, ProfileCreate, ProfileUpdate, ProfileResponse,
-    ProfileMedia, ProfileMediaCreate,
+    ProfileMedia, ProfileMediaCreate, MediaVariant, PhotoUploadResult, BatchPhotoUploadResponse,
     Greeting, GreetingCreate, GreetingResponse,
     InvitationPublicView, SectionsEnabled, BackgroundMusic, MapSettings, ContactInfo,
     WeddingEvent,
     EventInvitation, EventInvitationCreate, EventInvitationUpdate, EventInvitationResponse,
     RSVP, RSVPCreate, RSVPResponse, RSVPStats,
-    Analytics, ViewSession, DailyView, ViewTrackingRequest, InteractionTrackingRequest, 
+    DailyView, ViewTrackingRequest, InteractionTrackingRequest, 
     LanguageTrackingRequest, AnalyticsResponse, AnalyticsSummary,
-    RateLimit, AuditLog, AuditLogResponse
+    AuditLog, AuditLogResponse,
+    PdfExportRequest, PdfExportStatus
 )
 from auth import (
     get_password_hash, verify_password, 
     create_access_token, get_current_admin
 )
+from cache import TTLCache
+from indexes import ensure_indexes
+from analytics_buffer import AnalyticsBuffer
+from rate_limit import RateLimitResult, create_rate_limiter
+from workers import WorkerPool, WorkerPoolBusy
+from image_processing import TranscodedPhoto, transcode_photo
+from uploads import UploadSizeLimitMiddleware, spool_upload, upload_limit
+from media_store import MediaStore, content_hash
+from static_files import UploadStaticFiles
+from pdf_cache import PdfCache, pdf_cache_key
+from pdf_assets import language_font_version, preload_pdf_assets
+from pdf_generator import generate_invitation_pdf
+from pdf_export import PdfExportManager
+from qr_codes import QR_DEFAULT_SIZE, QR_MEDIA_TYPES, QR_RENDER_VERSION, QR_SIZES, QrCodeStore, render_qr_sheet
+from http_cache import (
+    make_etag, content_etag, is_not_modified,
+    cache_headers, not_modified_response
+)
 
 
 ROOT_DIR = Path(__file__).parent
@@ -57,15 +66,93 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# Guest analytics are aggregated in memory and flushed as bulk upserts
+analytics_buffer = AnalyticsBuffer(
+    db,
+    flush_interval_ms=int(os.environ.get('ANALYTICS_FLUSH_INTERVAL_MS', 1000)),
+    max_events=int(os.environ.get('ANALYTICS_FLUSH_MAX_EVENTS', 500))
+)
+
+# Submission rate limiting: "memory" (per worker) or "mongo" (shared by all workers)
+rate_limiter = create_rate_limiter(os.environ.get('RATE_LIMIT_BACKEND', 'memory'), db)
+
 # Create the main app without a prefix
 app = FastAPI()
 
-# Create uploads directory
+# Uploaded photos are stored content-addressed (named by SHA-256)
 UPLOADS_DIR = Path("/app/uploads/photos")
-UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+media_store = MediaStore(UPLOADS_DIR, url_prefix="/uploads/photos", files=db.media_files)
+
+# Photo transcoding runs in worker processes so uploads never block guest traffic
+image_pool = WorkerPool(
+    "image",
+    max_workers=int(os.environ.get('IMAGE_WORKERS', min(4, os.cpu_count() or 1))),
+    max_pending=int(os.environ.get('IMAGE_QUEUE_LIMIT', 32))
+)
+
+# In-process cache of published public invitation snapshots (per worker)
+invitation_cache = TTLCache(
+    max_entries=int(os.environ.get('INVITATION_CACHE_SIZE', 512)),
+    ttl_seconds=float(os.environ.get('INVITATION_CACHE_TTL_SECONDS', 60))
+)
+
+# Profile fields re-checked on every read of a published public view
+PUBLIC_VIEW_GUARD_FIELDS = ('is_active', 'link_expiry_date', 'expires_at')
+
+# Cache-Control for public invitation content; clients revalidate with ETags
+PUBLIC_CACHE_CONTROL = f"public, max-age={int(os.environ.get('PUBLIC_CACHE_MAX_AGE', 60))}, must-revalidate"
+
+# Slug -> profile summary cache shared by public endpoints (per worker)
+# Invalidation only reaches the worker that handled the write, so the TTL bounds
+# how long other workers accept submissions for a deactivated or deleted profile;
+# it matches the invitation cache so both public paths go stale for equally long
+profile_summary_cache = TTLCache(
+    max_entries=int(os.environ.get('PROFILE_SUMMARY_CACHE_SIZE', 2048)),
+    ttl_seconds=float(os.environ.get('PROFILE_SUMMARY_CACHE_TTL_SECONDS', 60))
+)
+PROFILE_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "slug": 1, "is_active": 1,
+    "link_expiry_date": 1, "expires_at": 1, "updated_at": 1
+}
+
+# PDF rendering runs in its own worker processes (deity backgrounds and fonts preloaded per process)
+pdf_pool = WorkerPool(
+    "pdf",
+    max_workers=int(os.environ.get('PDF_WORKERS', 2)),
+    max_pending=int(os.environ.get('PDF_QUEUE_LIMIT', 8)),
+    initializer=preload_pdf_assets
+)
+PDF_RENDER_TIMEOUT_SECONDS = float(os.environ.get('PDF_RENDER_TIMEOUT_SECONDS', 30))
+
+# Bulk PDF export jobs (kept by the server process that created them)
+pdf_exports = PdfExportManager(
+    # Late-bound: get_invitation_pdf is defined with the PDF routes below
+    render=lambda profile, language: get_invitation_pdf(profile, language),
+    # Shared by all export jobs and capped so at least max_workers queue slots stay free
+    concurrency=min(pdf_pool.max_workers, pdf_pool.max_pending - pdf_pool.max_workers),
+    job_ttl_seconds=float(os.environ.get('PDF_EXPORT_JOB_TTL_SECONDS', 3600))
+)
+
+# Rendered invitation PDFs: memory tier per worker plus optional shared disk tier
+pdf_cache = PdfCache(
+    max_bytes=int(os.environ.get('PDF_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    disk_dir=Path(os.environ['PDF_CACHE_DIR']) if os.environ.get('PDF_CACHE_DIR') else None
+)
+
+# Public origin of the guest-facing site, encoded in QR codes
+PUBLIC_BASE_URL = os.environ.get('PUBLIC_BASE_URL', 'https://marry-mate-14.preview.emergentagent.com').rstrip('/')
+
+# QR code images: memory tier per worker plus optional shared disk tier
+qr_store = QrCodeStore(
+    max_bytes=int(os.environ.get('QR_CACHE_MAX_BYTES', 8 * 1024 * 1024)),
+    disk_dir=Path(os.environ['QR_CACHE_DIR']) if os.environ.get('QR_CACHE_DIR') else None
+)
+
+# Event types that have their own public invitation link
+VALID_EVENT_TYPES = ['engagement', 'haldi', 'mehendi', 'marriage', 'reception']
 
 # Mount static files for serving uploaded photos
-app.mount("/uploads", StaticFiles(directory="/app/uploads"), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory="/app/uploads"), name="uploads")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -131,6 +218,28 @@ async def check_profile_active(profile: dict) -> bool:
     return True
 
 
+def invitation_expires_at(profile: dict) -> Optional[datetime]:
+    """PHASE 12: Timezone-aware invitation expiry, or None if it never expires"""
+    expires_at = profile.get('expires_at')
+    if not expires_at:
+        return None
+    
+    if isinstance(expires_at, str):
+        expires_at = datetime.fromisoformat(expires_at)
+    
+    # Ensure timezone-aware
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    
+    return expires_at
+
+
+def is_invitation_expired(profile: dict) -> bool:
+    """PHASE 12: Check invitation expiry (separate from link expiry)"""
+    expires_at = invitation_expires_at(profile)
+    return expires_at is not None and datetime.now(timezone.utc) > expires_at
+
+
 def get_client_ip(request: Request) -> str:
     """Get client IP address from request"""
     # Check for X-Forwarded-For header (from proxy/load balancer)
@@ -143,42 +252,49 @@ def get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-async def check_rate_limit(ip_address: str, endpoint: str, max_count: int) -> bool:
+async def check_rate_limit(ip_address: str, endpoint: str, max_count: int) -> RateLimitResult:
     """
-    Check if IP has exceeded rate limit for endpoint
-    Returns True if allowed, False if limit exceeded
+    Record a submission and check it against the per-day limit for endpoint
     
     Args:
         ip_address: Client IP address
         endpoint: "rsvp" or "wishes"
         max_count: Maximum allowed submissions per day
     """
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    
-    # Find or create rate limit record
-    rate_record = await db.rate_limits.find_one({
-        "ip_address": ip_address,
-        "endpoint": endpoint,
-        "date": today
-    }, {"_id": 0})
+    return await rate_limiter.hit(ip_address, endpoint, max_count)
+
+
+def rate_limit_exceeded(result: RateLimitResult, detail: str) -> HTTPException:
+    """429 error telling the client when it may retry"""
+    return HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(result.retry_after)}
+    )
+
+
+async def get_profile_summary(slug: str) -> Optional[dict]:
+    """
+    Resolve slug to the profile fields public write-side endpoints need
     
-    if not rate_record:
-        # Create new record
-        new_record = RateLimit(
-            ip_address=ip_address,
-            endpoint=endpoint,
-            date=today,
-            count=1
-        )
-        doc = new_record.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        doc['updated_at'] = doc['updated_at'].isoformat()
-        await db.rate_limits.insert_one(doc)
-        return True
-    
-    # Check if limit exceeded
-    if rate_record['count'] >= max_count:
-        return False
+    Loads only id, activity/expiry fields and updated_at, cached per worker and
+    invalidated on profile update/delete (other workers catch up within
+    PROFILE_SUMMARY_CACHE_TTL_SECONDS).
+    """
+    summary = profile_summary_cache.get(slug)
+    if summary is None:
+        summary = await db.profiles.find_one({"slug": slug}, PROFILE_SUMMARY_PROJECTION)
+        if summary is None:
+            return None
+        profile_summary_cache.set(slug, summary, tag=summary['id'])
+    return summary
+
+
+def invitation_url(slug: str, event_type: Optional[str] = None) -> str:
+    """Absolute public URL of an invitation (or one of its event pages), as encoded in QR codes"""
+    if event_type:
+        return f"{PUBLIC_BASE_URL}/invite/{slug}/{event_type}"
+    return f"{PUBLIC_BASE_URL}/invite/{slug}"
 
 
 def generate_event_links(slug: str, events: List[dict]) -> Dict[str, str]:
@@ -271,54 +387,73 @@ def sanitize_html(html: str) -> str:
 # File Upload Validation
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+MAX_PHOTOS_PER_PROFILE = 20
+# Room for multipart boundaries, headers and form fields around the file
+MULTIPART_OVERHEAD = 64 * 1024
+# Where uploads are spooled before transcoding (system temp dir by default)
+UPLOAD_TMP_DIR = os.environ.get('UPLOAD_TMP_DIR') or None
 
 def validate_image_file(file: UploadFile) -> tuple[bool, str]:
-    """Validate image file"""
+    """Validate image file name (size and content are checked while spooling the upload)"""
     # Check extension
-    ext = Path(file.filename).suffix.lower()
+    ext = Path(file.filename or "").suffix.lower()
     if ext not in ALLOWED_EXTENSIONS:
         return False, "Invalid file type. Allowed: JPG, PNG, WebP, GIF"
     
-    # Check file size
-    file.file.seek(0, 2)
-    size = file.file.tell()
-    file.file.seek(0)
-    if size > MAX_FILE_SIZE:
-        return False, "File too large. Maximum size: 5MB"
-    
     return True, ""
 
 
-async def convert_to_webp(file: UploadFile, quality: int = 85) -> tuple[bytes, int]:
-    """Convert image to WebP format and return bytes with size"""
+async def transcode_upload(file: UploadFile, quality: int = 85) -> TranscodedPhoto:
+    """Convert an uploaded image to WebP renditions (full size plus responsive derivatives)"""
+    # Stream to a temp file with size and magic-byte checks instead of reading it into memory
+    source_path = await spool_upload(file, MAX_FILE_SIZE, UPLOAD_TMP_DIR)
+    
+    # Decode/resize/encode runs in the image worker pool, off the event loop
     try:
-        # Read image
-        image_data = await file.read()
-        img = PILImage.open(io.BytesIO(image_data))
-        
-        # Convert RGBA to RGB if necessary
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = PILImage.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = background
-        
-        # Resize if too large (max 1920px width)
-        max_width = 1920
-        if img.width > max_width:
-            ratio = max_width / img.width
-            new_height = int(img.height * ratio)
-            img = img.resize((max_width, new_height), PILImage.Resampling.LANCZOS)
-        
-        # Convert to WebP
-        output = io.BytesIO()
-        img.save(output, format='WebP', quality=quality, optimize=True)
-        webp_data = output.getvalue()
-        
-        return webp_data, len(webp_data)
-    except Exception as e:
+        return await image_pool.run(transcode_photo, str(source_path), quality)
+    except WorkerPoolBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many photos are being processed. Please try again shortly.",
+            headers={"Retry-After": "5"}
+        )
+    except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid image file: {str(e)}")
+    finally:
+        source_path.unlink(missing_ok=True)
+
+
+async def build_photo_media(profile_id: str, photo: TranscodedPhoto, filename: Optional[str], caption: str, order: int) -> ProfileMedia:
+    """
+    Store a transcoded photo's renditions and build its media record
+    
+    Takes a reference on the stored files; callers must media_store.release()
+    the media's content_hash if the record is not inserted.
+    """
+    photo_hash = await asyncio.to_thread(content_hash, photo.full.data)
+    urls = await media_store.acquire(photo_hash, [rendition.data for rendition in photo.renditions])
+    variants = [
+        MediaVariant(
+            width=rendition.width,
+            height=rendition.height,
+            url=url,
+            file_size=len(rendition.data)
+        )
+        for rendition, url in zip(photo.renditions, urls)
+    ]
+    return ProfileMedia(
+        profile_id=profile_id,
+        media_type="photo",
+        media_url=variants[-1].url,
+        caption=caption if caption else None,
+        order=order,
+        is_cover=False,
+        file_size=variants[-1].file_size,
+        original_filename=filename,
+        content_hash=photo_hash,
+        variants=variants,
+        placeholder=photo.placeholder
+    )
 
 
 # ==================== AUTH ROUTES ====================
@@ -388,7 +523,7 @@ async def get_all_profiles(admin_id: str = Depends(get_current_admin)):
 
 
 @api_router.post("/admin/profiles", response_model=ProfileResponse)
-async def create_profile(profile_data: ProfileCreate, admin_id: str = Depends(get_current_admin)):
+async def create_profile(profile_data: ProfileCreate, background_tasks: BackgroundTasks, admin_id: str = Depends(get_current_admin)):
     """Create new profile"""
     # Generate unique slug
     slug = generate_slug(profile_data.groom_name, profile_data.bride_name)
@@ -470,6 +605,9 @@ async def create_profile(profile_data: ProfileCreate, admin_id: str = Depends(ge
         }
     )
     
+    # Render the new invitation's QR codes after the response is sent
+    background_tasks.add_task(qr_store.warm, invitation_url(profile.slug))
+    
     # Prepare response
     response_data = profile.model_dump()
     response_data['invitation_link'] = f"/invite/{profile.slug}"
@@ -561,6 +699,10 @@ async def update_profile(
         {"id": profile_id},
         {"$set": update_dict}
     )
+    profile_summary_cache.invalidate_tag(profile_id)
+    await refresh_public_invitation(profile_id)
+    # Rendered PDFs of the previous version can no longer be requested
+    await pdf_cache.invalidate_profile(profile_id)
     
     # Get updated profile
     updated_profile = await db.profiles.find_one({"id": profile_id}, {"_id": 0})
@@ -615,6 +757,9 @@ async def delete_profile(profile_id: str, admin_id: str = Depends(get_current_ad
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Profile not found")
     
+    profile_summary_cache.invalidate_tag(profile_id)
+    await refresh_public_invitation(profile_id)
+    
     # PHASE 12 - PART 5: Audit log
     await log_audit_action(
         action="profile_delete",
@@ -631,7 +776,7 @@ async def delete_profile(profile_id: str, admin_id: str = Depends(get_current_ad
 
 
 @api_router.post("/admin/profiles/{profile_id}/duplicate", response_model=ProfileResponse)
-async def duplicate_profile(profile_id: str, admin_id: str = Depends(get_current_admin)):
+async def duplicate_profile(profile_id: str, background_tasks: BackgroundTasks, admin_id: str = Depends(get_current_admin)):
     """Duplicate an existing profile with new slug and appended (Copy) to names"""
     # Fetch the original profile
     original_profile = await db.profiles.find_one({"id": profile_id}, {"_id": 0})
@@ -726,6 +871,8 @@ async def duplicate_profile(profile_id: str, admin_id: str = Depends(get_current
     
     response_data['invitation_link'] = f"/invite/{response_data['slug']}"
     
+    background_tasks.add_task(qr_store.warm, invitation_url(response_data['slug']))
+    
     return ProfileResponse(**response_data)
 
 
@@ -803,7 +950,7 @@ async def get_all_templates(admin_id: str = Depends(get_current_admin)):
 
 
 @api_router.post("/admin/profiles/from-template/{template_id}", response_model=ProfileResponse)
-async def create_profile_from_template(template_id: str, admin_id: str = Depends(get_current_admin)):
+async def create_profile_from_template(template_id: str, background_tasks: BackgroundTasks, admin_id: str = Depends(get_current_admin)):
     """Create a new profile from a template"""
     # Fetch the template
     template = await db.profiles.find_one({"id": template_id, "is_template": True}, {"_id": 0})
@@ -881,6 +1028,8 @@ async def create_profile_from_template(template_id: str, admin_id: str = Depends
     
     response_data['invitation_link'] = f"/invite/{response_data['slug']}"
     
+    background_tasks.add_task(qr_store.warm, invitation_url(response_data['slug']))
+    
     return ProfileResponse(**response_data)
 
 
@@ -960,6 +1109,7 @@ async def create_event_invitation(
     
     # Insert into database
     await db.event_invitations.insert_one(doc)
+    await refresh_public_invitation(profile_id)
     
     # Prepare response
     response_data = doc.copy()
@@ -1006,6 +1156,7 @@ async def update_event_invitation(
         {"id": invitation_id},
         {"$set": update_dict}
     )
+    await refresh_public_invitation(event_invitation['profile_id'])
     
     # Fetch updated document
     updated = await db.event_invitations.find_one({"id": invitation_id}, {"_id": 0})
@@ -1024,11 +1175,16 @@ async def update_event_invitation(
 @api_router.delete("/admin/event-invitations/{invitation_id}")
 async def delete_event_invitation(invitation_id: str, admin_id: str = Depends(get_current_admin)):
     """Delete an event invitation"""
-    result = await db.event_invitations.delete_one({"id": invitation_id})
+    deleted = await db.event_invitations.find_one_and_delete(
+        {"id": invitation_id},
+        projection={"_id": 0, "profile_id": 1}
+    )
     
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Event invitation not found")
     
+    await refresh_public_invitation(deleted.get('profile_id'))
+    
     return {"message": "Event invitation deleted successfully"}
 
 
@@ -1075,6 +1231,7 @@ async def add_profile_media(
     doc['created_at'] = doc['created_at'].isoformat()
     
     await db.profile_media.insert_one(doc)
+    await refresh_public_invitation(profile_id)
     
     return media
 
@@ -1082,21 +1239,36 @@ async def add_profile_media(
 @api_router.delete("/admin/media/{media_id}")
 async def delete_media(media_id: str, admin_id: str = Depends(get_current_admin)):
     """Delete media"""
-    result = await db.profile_media.delete_one({"id": media_id})
+    deleted = await db.profile_media.find_one_and_delete(
+        {"id": media_id},
+        projection={"_id": 0, "profile_id": 1, "content_hash": 1}
+    )
     
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Media not found")
     
+    # Stored files are shared by every media item with the same content hash;
+    # they are removed with the last reference
+    await media_store.release(deleted.get('content_hash'))
+    
+    # Drop the cover reference if this was the cover photo
+    await db.profiles.update_one(
+        {"id": deleted.get('profile_id'), "cover_photo_id": media_id},
+        {"$set": {"cover_photo_id": None}}
+    )
+    await refresh_public_invitation(deleted.get('profile_id'))
+    
     return {"message": "Media deleted successfully"}
 
 
 @api_router.get("/admin/profiles/{profile_id}/media", response_model=List[ProfileMedia])
 async def get_profile_media(profile_id: str, admin_id: str = Depends(get_current_admin)):
     """Get all media for a profile"""
-    media_list = await db.profile_media.find(
-        {"profile_id": profile_id},
-        {"_id": 0}
-    ).sort("order", 1).to_list(1000)
+    profile, media_list = await asyncio.gather(
+        db.profiles.find_one({"id": profile_id}, {"_id": 0, "cover_photo_id": 1}),
+        db.profile_media.find({"profile_id": profile_id}, {"_id": 0}).sort("order", 1).to_list(1000)
+    )
+    apply_cover_flag(media_list, (profile or {}).get('cover_photo_id'))
     
     for media in media_list:
         if isinstance(media.get('created_at'), str):
@@ -1119,31 +1291,21 @@ async def upload_photo(
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
-    # Validate max 20 photos per profile
+    # Validate max photos per profile
     media_count = await db.profile_media.count_documents({
         "profile_id": profile_id,
         "media_type": "photo"
     })
-    if media_count >= 20:
-        raise HTTPException(status_code=400, detail="Maximum 20 photos allowed per profile")
+    if media_count >= MAX_PHOTOS_PER_PROFILE:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_PHOTOS_PER_PROFILE} photos allowed per profile")
     
     # Validate image file
     is_valid, error_msg = validate_image_file(file)
     if not is_valid:
         raise HTTPException(status_code=400, detail=error_msg)
     
-    # Convert to WebP
-    webp_data, file_size = await convert_to_webp(file, quality=85)
-    
-    # Generate unique filename
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
-    filename = f"{profile_id}_{timestamp}_{random_suffix}.webp"
-    file_path = UPLOADS_DIR / filename
-    
-    # Save file
-    with open(file_path, 'wb') as f:
-        f.write(webp_data)
+    # Convert to WebP renditions and save them
+    photo = await transcode_upload(file, quality=85)
     
     # Get next order number
     max_order = await db.profile_media.find_one(
@@ -1153,33 +1315,122 @@ async def upload_photo(
     next_order = (max_order.get('order', 0) + 1) if max_order else 0
     
     # Create media record
-    media = ProfileMedia(
-        profile_id=profile_id,
-        media_type="photo",
-        media_url=f"/uploads/photos/{filename}",
-        caption=caption if caption else None,
-        order=next_order,
-        is_cover=False,
-        file_size=file_size,
-        original_filename=file.filename
-    )
+    media = await build_photo_media(profile_id, photo, file.filename, caption, next_order)
     
     doc = media.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     
-    await db.profile_media.insert_one(doc)
+    try:
+        await db.profile_media.insert_one(doc)
+    except Exception:
+        await media_store.release(media.content_hash)
+        raise
+    await refresh_public_invitation(profile_id)
     
     return media
 
 
+@api_router.post("/admin/profiles/{profile_id}/upload-photos", response_model=BatchPhotoUploadResponse)
+async def upload_photos(
+    profile_id: str,
+    files: List[UploadFile] = File(...),
+    admin_id: str = Depends(get_current_admin)
+):
+    """
+    Upload several photos for a profile in one request
+    
+    Files are validated up front, transcoded concurrently in the image worker
+    pool and stored with one insert. Each file succeeds or fails on its own;
+    successful photos get contiguous order values in upload order.
+    """
+    profile = await db.profiles.find_one({"id": profile_id}, {"_id": 0, "id": 1})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    media_count, max_order = await asyncio.gather(
+        db.profile_media.count_documents({"profile_id": profile_id, "media_type": "photo"}),
+        db.profile_media.find_one({"profile_id": profile_id}, {"_id": 0, "order": 1}, sort=[("order", -1)])
+    )
+    remaining_slots = MAX_PHOTOS_PER_PROFILE - media_count
+    
+    # Validate everything before doing any image work
+    errors: List[Optional[str]] = []
+    for file in files:
+        is_valid, error_msg = validate_image_file(file)
+        if not is_valid:
+            errors.append(error_msg)
+        elif remaining_slots <= 0:
+            errors.append(f"Maximum {MAX_PHOTOS_PER_PROFILE} photos allowed per profile")
+        else:
+            errors.append(None)
+            remaining_slots -= 1
+    
+    async def transcode(index: int) -> Optional[TranscodedPhoto]:
+        if errors[index] is not None:
+            return None
+        try:
+            return await transcode_upload(files[index], quality=85)
+        except HTTPException as e:
+            errors[index] = e.detail
+            return None
+    
+    photos = await asyncio.gather(*(transcode(index) for index in range(len(files))))
+    
+    next_order = (max_order.get('order', 0) + 1) if max_order else 0
+    results = []
+    docs = []
+    try:
+        for file, photo, error in zip(files, photos, errors):
+            if photo is None:
+                results.append(PhotoUploadResult(filename=file.filename, success=False, error=error))
+                continue
+            
+            media = await build_photo_media(profile_id, photo, file.filename, "", next_order)
+            next_order += 1
+            
+            doc = media.model_dump()
+            doc['created_at'] = doc['created_at'].isoformat()
+            docs.append(doc)
+            results.append(PhotoUploadResult(filename=file.filename, success=True, media=media))
+        
+        if docs:
+            await db.profile_media.insert_many(docs)
+    except Exception:
+        # Drop the file references of photos whose record was not stored
+        stored = await db.profile_media.find(
+            {"id": {"$in": [doc['id'] for doc in docs]}}, {"_id": 0, "id": 1}
+        ).to_list(len(docs))
+        stored_ids = {media['id'] for media in stored}
+        for doc in docs:
+            if doc['id'] not in stored_ids:
+                await media_store.release(doc['content_hash'])
+        raise
+    
+    if docs:
+        await refresh_public_invitation(profile_id)
+    
+    return BatchPhotoUploadResponse(
+        uploaded=len(docs),
+        failed=len(files) - len(docs),
+        results=results
+    )
+
+
 @api_router.put("/admin/media/{media_id}/set-cover")
 async def set_cover_photo(
     media_id: str,
     admin_id: str = Depends(get_current_admin)
 ):
-    """Set a photo as the cover photo"""
-    # Find the media
-    media = await db.profile_media.find_one({"id": media_id})
+    """
+    Set a photo as the cover photo
+    
+    The profile's cover_photo_id is the single source of truth (media is_cover
+    is derived from it on read), so switching covers is one atomic write.
+    """
+    media = await db.profile_media.find_one(
+        {"id": media_id},
+        {"_id": 0, "profile_id": 1, "media_type": 1}
+    )
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
     
@@ -1188,23 +1439,11 @@ async def set_cover_photo(
     
     profile_id = media['profile_id']
     
-    # Unset all other covers for this profile
-    await db.profile_media.update_many(
-        {"profile_id": profile_id},
-        {"$set": {"is_cover": False}}
-    )
-    
-    # Set this media as cover
-    await db.profile_media.update_one(
-        {"id": media_id},
-        {"$set": {"is_cover": True}}
-    )
-    
-    # Update profile cover_photo_id
     await db.profiles.update_one(
         {"id": profile_id},
         {"$set": {"cover_photo_id": media_id}}
     )
+    await refresh_public_invitation(profile_id)
     
     return {"message": "Cover photo updated successfully"}
 
@@ -1215,20 +1454,51 @@ async def reorder_media(
     media_ids: List[str],
     admin_id: str = Depends(get_current_admin)
 ):
-    """Reorder media items"""
-    # Check if profile exists
-    profile = await db.profiles.find_one({"id": profile_id})
+    """
+    Reorder media items
+    
+    media_ids lists the profile's media in their new order (position = order).
+    Media left out of a partial list follow the listed ones, keeping their
+    current relative order, so orders stay unique. Returns the profile's
+    complete media order so clients need not refetch.
+    """
+    # Profile check and the profile's media set are independent lookups
+    profile, media_list = await asyncio.gather(
+        db.profiles.find_one({"id": profile_id}, {"_id": 0, "id": 1}),
+        db.profile_media.find({"profile_id": profile_id}, {"_id": 0, "id": 1, "order": 1}).to_list(1000)
+    )
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
-    # Update order for each media
-    for index, media_id in enumerate(media_ids):
-        await db.profile_media.update_one(
-            {"id": media_id, "profile_id": profile_id},
-            {"$set": {"order": index}}
-        )
+    if len(set(media_ids)) != len(media_ids):
+        raise HTTPException(status_code=400, detail="Duplicate media ids in reorder request")
+    
+    current_order = {media['id']: media.get('order', 0) for media in media_list}
+    unknown_ids = [media_id for media_id in media_ids if media_id not in current_order]
+    if unknown_ids:
+        raise HTTPException(status_code=400, detail=f"Media not found in this profile: {', '.join(unknown_ids)}")
+    
+    listed = set(media_ids)
+    unlisted_ids = [
+        media_id for media_id, _ in sorted(current_order.items(), key=lambda item: item[1])
+        if media_id not in listed
+    ]
+    new_order = list(enumerate(media_ids + unlisted_ids))
+    
+    # One unordered bulk write; each update touches a distinct document
+    operations = [
+        UpdateOne({"id": media_id, "profile_id": profile_id}, {"$set": {"order": index}})
+        for index, media_id in new_order
+        if current_order[media_id] != index
+    ]
+    if operations:
+        await db.profile_media.bulk_write(operations, ordered=False)
+        await refresh_public_invitation(profile_id)
     
-    return {"message": "Media reordered successfully"}
+    return {
+        "message": "Media reordered successfully",
+        "order": [{"id": media_id, "order": order} for order, media_id in new_order]
+    }
 
 
 @api_router.put("/admin/media/{media_id}/caption")
@@ -1238,61 +1508,87 @@ async def update_media_caption(
     admin_id: str = Depends(get_current_admin)
 ):
     """Update media caption"""
-    result = await db.profile_media.update_one(
+    media = await db.profile_media.find_one_and_update(
         {"id": media_id},
-        {"$set": {"caption": caption if caption else None}}
+        {"$set": {"caption": caption if caption else None}},
+        projection={"_id": 0, "profile_id": 1}
     )
     
-    if result.matched_count == 0:
+    if not media:
         raise HTTPException(status_code=404, detail="Media not found")
     
+    await refresh_public_invitation(media.get('profile_id'))
+    
     return {"message": "Caption updated successfully"}
 
 
-# ==================== PUBLIC INVITATION ROUTES ====================
+# ==================== PUBLIC INVITATION SNAPSHOTS ====================
 
-@api_router.get("/invite/{slug}", response_model=InvitationPublicView)
-async def get_invitation(slug: str):
-    """Get public invitation by slug"""
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
-    
-    if not profile:
-        raise HTTPException(status_code=404, detail="Invitation not found")
+def apply_cover_flag(media_list: List[dict], cover_photo_id: Optional[str]) -> None:
+    """Derive each media item's is_cover from the profile's cover_photo_id"""
+    for media in media_list:
+        media['is_cover'] = cover_photo_id is not None and media.get('id') == cover_photo_id
+
+
+def build_invitation_view(
+    profile: dict,
+    media_list: List[dict],
+    greetings_list: List[dict],
+    event_type: Optional[str] = None,
+    event_invitation: Optional[dict] = None
+) -> InvitationPublicView:
+    """
+    Assemble the public view of a profile
     
-    # Check if active and not expired (link expiry)
-    if not await check_profile_active(profile):
-        raise HTTPException(status_code=410, detail="This invitation link has expired")
+    Args:
+        profile: Profile document
+        media_list: Profile media sorted by order
+        greetings_list: Approved greetings, newest first
+        event_type: Event type for event-specific links, None for the main link
+        event_invitation: EventInvitation document for event_type, if any
+    
+    Raises:
+        HTTPException: 404 if the event link is disabled or the event does not exist
+    """
+    design_id = profile['design_id']
+    deity_id = profile.get('deity_id')
+    events = profile.get('events', [])
     
-    # PHASE 12: Check invitation expiry (separate from link expiry)
-    is_expired = False
-    expires_at = profile.get('expires_at')
-    if expires_at:
-        if isinstance(expires_at, str):
-            expires_at = datetime.fromisoformat(expires_at)
-        
-        # Ensure timezone-aware
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=timezone.utc)
+    if event_type:
+        # NEW: Use EventInvitation if it exists (dedicated event invitation links)
+        if event_invitation:
+            # Check if enabled
+            if not event_invitation.get('enabled', True):
+                raise HTTPException(status_code=404, detail="This event invitation is not available")
+            
+            # Use EventInvitation's design_id and deity_id
+            design_id = event_invitation.get('design_id', profile['design_id'])
+            deity_id = event_invitation.get('deity_id', profile.get('deity_id'))
+        else:
+            # FALLBACK: Find the specific event in the profile (PHASE 13 legacy)
+            event_data = None
+            for evt in events:
+                if evt.get('event_type', '').lower() == event_type:
+                    event_data = evt
+                    break
+            
+            if not event_data:
+                raise HTTPException(
+                    status_code=404, 
+                    detail=f"Event '{event_type}' not found in this invitation"
+                )
+            
+            # Use event's design or profile default
+            design_id = event_data.get('design_preset_id') or profile['design_id']
         
-        if datetime.now(timezone.utc) > expires_at:
-            is_expired = True
-    
-    # Get media
-    media_list = await db.profile_media.find(
-        {"profile_id": profile['id']},
-        {"_id": 0}
-    ).sort("order", 1).to_list(1000)
-    
-    # Get greetings - PHASE 11: Only return approved greetings for public view (last 20)
-    greetings_list = await db.greetings.find(
-        {"profile_id": profile['id'], "approval_status": "approved"},
-        {"_id": 0}
-    ).sort("created_at", -1).limit(20).to_list(20)
+        # Filter events to only show events matching the event_type (for backward compatibility)
+        events = [evt for evt in events if evt.get('event_type', '').lower() == event_type]
     
     # Convert date strings
     if isinstance(profile.get('event_date'), str):
         profile['event_date'] = datetime.fromisoformat(profile['event_date'])
     
+    apply_cover_flag(media_list, profile.get('cover_photo_id'))
     for media in media_list:
         if isinstance(media.get('created_at'), str):
             media['created_at'] = datetime.fromisoformat(media['created_at'])
@@ -1311,8 +1607,8 @@ async def get_invitation(slug: str):
         city=profile.get('city'),
         invitation_message=profile.get('invitation_message'),
         language=profile['language'],
-        design_id=profile['design_id'],
-        deity_id=profile.get('deity_id'),
+        design_id=design_id,  # EventInvitation's design or fallback
+        deity_id=deity_id,  # EventInvitation's deity or fallback
         whatsapp_groom=profile.get('whatsapp_groom'),
         whatsapp_bride=profile.get('whatsapp_bride'),
         enabled_languages=profile.get('enabled_languages', ['english']),
@@ -1325,160 +1621,428 @@ async def get_invitation(slug: str):
         background_music=BackgroundMusic(**profile.get('background_music', {'enabled': False, 'file_url': None})),
         map_settings=MapSettings(**profile.get('map_settings', {'embed_enabled': False})),
         contact_info=ContactInfo(**profile.get('contact_info', {})),  # PHASE 11: Contact information
-        events=[WeddingEvent(**e) for e in profile.get('events', [])],
+        events=[WeddingEvent(**e) for e in events],
         media=[ProfileMedia(**m) for m in media_list],
-        greetings=[GreetingResponse(**g) for g in greetings_list],
-        is_expired=is_expired  # PHASE 12: Invitation expiry status
+        greetings=[GreetingResponse(**g) for g in greetings_list]
     )
 
 
-@api_router.get("/invite/{slug}/{event_type}", response_model=InvitationPublicView)
-async def get_event_invitation(slug: str, event_type: str):
-    """Get public invitation for specific event
+def render_invitation_snapshots(
+    profile: dict,
+    media_list: List[dict],
+    greetings_list: List[dict],
+    event_invitations: List[dict]
+) -> List[dict]:
+    """
+    Render the main view and every event view of a profile into snapshot documents
     
-    NEW: Checks EventInvitation first (dedicated event invitation links)
-    FALLBACK: Falls back to WeddingEvent within profile (PHASE 13 legacy)
+    Each snapshot holds the JSON body without the time-dependent is_expired flag,
+    or the error an event link resolves to, plus the profile fields needed to
+    re-check link activity and expiry on read. version is the profile's
+    snapshot_version the sources were loaded at.
     """
-    # Validate event type
-    valid_event_types = ['engagement', 'haldi', 'mehendi', 'marriage', 'reception']
-    event_type_lower = event_type.lower()
-    if event_type_lower not in valid_event_types:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Invalid event type. Must be one of: {', '.join(valid_event_types)}"
-        )
+    guard = {field: profile.get(field) for field in PUBLIC_VIEW_GUARD_FIELDS}
+    published_at = datetime.now(timezone.utc).isoformat()
+    version = profile.get('snapshot_version', 0)
+    event_invitations_by_type = {ei['event_type']: ei for ei in event_invitations}
+    
+    snapshots = []
+    for event_type in [None] + VALID_EVENT_TYPES:
+        snapshot = {
+            "profile_id": profile['id'],
+            "slug": profile['slug'],
+            "variant": event_type or "",
+            "guard": guard,
+            "status_code": 200,
+            "detail": None,
+            "body": None,
+            "etag": None,
+            "published_at": published_at,
+            "version": version
+        }
+        
+        try:
+            view = build_invitation_view(
+                profile,
+                media_list,
+                greetings_list,
+                event_type,
+                event_invitations_by_type.get(event_type)
+            )
+            snapshot['body'] = view.model_dump_json(exclude={'is_expired'}).encode()
+            snapshot['etag'] = content_etag(snapshot['body'])
+        except HTTPException as e:
+            snapshot['status_code'] = e.status_code
+            snapshot['detail'] = e.detail
+        
+        snapshots.append(snapshot)
     
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
+    return snapshots
+
+
+async def load_invitation_sources(query: dict) -> Optional[dict]:
+    """
+    Resolve a profile with its media, approved greetings and event invitations
+    in a single aggregation round trip
     
-    if not profile:
-        raise HTTPException(status_code=404, detail="Invitation not found")
+    The related documents are attached as _media, _greetings and _event_invitations.
+    """
+    results = await db.profiles.aggregate([
+        {"$match": query},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "profile_media",
+            "let": {"profile_id": "$id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$profile_id", "$$profile_id"]}}},
+                {"$sort": {"order": 1}},
+                {"$project": {"_id": 0}}
+            ],
+            "as": "_media"
+        }},
+        # PHASE 11: Only approved greetings for public view (last 20)
+        {"$lookup": {
+            "from": "greetings",
+            "let": {"profile_id": "$id"},
+            "pipeline": [
+                {"$match": {
+                    "$expr": {"$eq": ["$profile_id", "$$profile_id"]},
+                    "approval_status": "approved"
+                }},
+                {"$sort": {"created_at": -1}},
+                {"$limit": 20},
+                {"$project": {"_id": 0}}
+            ],
+            "as": "_greetings"
+        }},
+        {"$lookup": {
+            "from": "event_invitations",
+            "let": {"profile_id": "$id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$profile_id", "$$profile_id"]}}},
+                {"$project": {"_id": 0}}
+            ],
+            "as": "_event_invitations"
+        }},
+        {"$project": {"_id": 0}}
+    ]).to_list(1)
+    
+    return results[0] if results else None
+
+
+async def publish_invitation_snapshots(sources: dict) -> Dict[str, dict]:
+    """Render and store the public snapshots of a profile loaded by load_invitation_sources"""
+    profile = dict(sources)
+    media_list = profile.pop('_media', [])
+    greetings_list = profile.pop('_greetings', [])
+    event_invitations = profile.pop('_event_invitations', [])
+    
+    snapshots = render_invitation_snapshots(profile, media_list, greetings_list, event_invitations)
+    
+    # Replace in place so readers always see either the old or the new snapshot.
+    # Only older versions are replaced: a publisher that loaded its sources
+    # before a concurrent write must not overwrite the newer snapshot. When a
+    # newer one exists the filter misses and the upsert hits the unique
+    # slug/variant index, which is the expected outcome.
+    try:
+        await db.invitation_snapshots.bulk_write([
+            ReplaceOne(
+                {
+                    "slug": snapshot['slug'],
+                    "variant": snapshot['variant'],
+                    # $not/$gte also matches snapshots published before versioning
+                    "version": {"$not": {"$gte": snapshot['version']}}
+                },
+                snapshot,
+                upsert=True
+            )
+            for snapshot in snapshots
+        ], ordered=False)
+    except BulkWriteError as e:
+        if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+            raise
     
-    # Check if active and not expired (link expiry)
-    if not await check_profile_active(profile):
-        raise HTTPException(status_code=410, detail="This invitation link has expired")
+    return {snapshot['variant']: snapshot for snapshot in snapshots}
+
+
+async def refresh_public_invitation(profile_id: Optional[str]):
+    """Re-publish the public snapshots of a profile after an admin write"""
+    if not profile_id:
+        return
     
-    # NEW: Check if EventInvitation exists for this profile and event_type
-    event_invitation = await db.event_invitations.find_one({
-        "profile_id": profile['id'],
-        "event_type": event_type_lower
-    }, {"_id": 0})
+    try:
+        # Bump the source version before loading, so these sources outrank any
+        # snapshot rendered from data read before this write
+        await db.profiles.update_one({"id": profile_id}, {"$inc": {"snapshot_version": 1}})
+        sources = await load_invitation_sources({"id": profile_id})
+        if sources:
+            await publish_invitation_snapshots(sources)
+        else:
+            await db.invitation_snapshots.delete_many({"profile_id": profile_id})
+    except Exception as e:
+        # Drop stale snapshots so the next view renders from the source documents
+        logging.error(f"Failed to publish invitation snapshots: {e}")
+        await db.invitation_snapshots.delete_many({"profile_id": profile_id})
     
-    # If EventInvitation exists, use it
-    if event_invitation:
-        # Check if enabled
-        if not event_invitation.get('enabled', True):
-            raise HTTPException(status_code=404, detail="This event invitation is not available")
-        
-        # Use EventInvitation's design_id and deity_id
-        design_id = event_invitation.get('design_id', profile['design_id'])
-        deity_id = event_invitation.get('deity_id', profile.get('deity_id'))
-    else:
-        # FALLBACK: Find the specific event in the profile (PHASE 13 legacy)
-        events = profile.get('events', [])
-        event_data = None
-        for evt in events:
-            if evt.get('event_type', '').lower() == event_type_lower:
-                event_data = evt
-                break
-        
-        if not event_data:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Event '{event_type}' not found in this invitation"
-            )
-        
-        # Use event's design or profile default
-        design_id = event_data.get('design_preset_id') or profile['design_id']
-        deity_id = profile.get('deity_id')
+    invitation_cache.invalidate_tag(profile_id)
+
+
+async def get_invitation_snapshot(slug: str, variant: str = "") -> dict:
+    """Load a published snapshot, publishing the profile on first view if needed"""
+    snapshot = invitation_cache.get((slug, variant))
     
-    # PHASE 12: Check invitation expiry (separate from link expiry)
-    is_expired = False
-    expires_at = profile.get('expires_at')
-    if expires_at:
-        if isinstance(expires_at, str):
-            expires_at = datetime.fromisoformat(expires_at)
+    if snapshot is None:
+        # A write publishing while this loads must not be undone by caching the older read
+        generation = invitation_cache.generation()
+        snapshot = await db.invitation_snapshots.find_one(
+            {"slug": slug, "variant": variant},
+            {"_id": 0}
+        )
         
-        # Ensure timezone-aware
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if snapshot is None:
+            sources = await load_invitation_sources({"slug": slug})
+            
+            if not sources:
+                raise HTTPException(status_code=404, detail="Invitation not found")
+            
+            if not await check_profile_active(sources):
+                raise HTTPException(status_code=410, detail="This invitation link has expired")
+            
+            snapshot = (await publish_invitation_snapshots(sources))[variant]
         
-        if datetime.now(timezone.utc) > expires_at:
-            is_expired = True
+        invitation_cache.set((slug, variant), snapshot, tag=snapshot['profile_id'], generation=generation)
     
-    # Get media
-    media_list = await db.profile_media.find(
-        {"profile_id": profile['id']},
-        {"_id": 0}
-    ).sort("order", 1).to_list(1000)
+    return snapshot
+
+
+async def invitation_snapshot_response(snapshot: dict, request: Request) -> Response:
+    """Serve a published snapshot as raw JSON bytes, honoring conditional requests"""
+    # Check if active and not expired (link expiry) - time-dependent, never stored
+    if not await check_profile_active(snapshot['guard']):
+        raise HTTPException(status_code=410, detail="This invitation link has expired")
     
-    # Get greetings - Only return approved greetings for public view (last 20)
-    greetings_list = await db.greetings.find(
-        {"profile_id": profile['id'], "approval_status": "approved"},
-        {"_id": 0}
-    ).sort("created_at", -1).limit(20).to_list(20)
+    if snapshot['status_code'] != 200:
+        raise HTTPException(status_code=snapshot['status_code'], detail=snapshot['detail'])
     
-    # Convert date strings
-    if isinstance(profile.get('event_date'), str):
-        profile['event_date'] = datetime.fromisoformat(profile['event_date'])
+    # PHASE 12: Invitation expiry is computed at request time
+    is_expired = is_invitation_expired(snapshot['guard'])
     
-    for media in media_list:
-        if isinstance(media.get('created_at'), str):
-            media['created_at'] = datetime.fromisoformat(media['created_at'])
+    # Content version: hash of the published body plus the expiry flag
+    etag = make_etag(snapshot.get('etag') or content_etag(snapshot['body']), is_expired)
+    # Expiring flips is_expired in the body, so it counts as a modification
+    last_modified = datetime.fromisoformat(snapshot['published_at'])
+    if is_expired:
+        last_modified = max(last_modified, invitation_expires_at(snapshot['guard']))
+    headers = cache_headers(etag, PUBLIC_CACHE_CONTROL, last_modified)
     
-    for greeting in greetings_list:
-        if isinstance(greeting.get('created_at'), str):
-            greeting['created_at'] = datetime.fromisoformat(greeting['created_at'])
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
     
-    # Filter events to only show events matching the event_type (for backward compatibility)
-    filtered_events = []
-    for evt in profile.get('events', []):
-        if evt.get('event_type', '').lower() == event_type_lower:
-            filtered_events.append(WeddingEvent(**evt))
+    body = snapshot['body'][:-1] + b',"is_expired":' + (b'true' if is_expired else b'false') + b'}'
     
-    return InvitationPublicView(
-        slug=profile['slug'],
-        groom_name=profile['groom_name'],
-        bride_name=profile['bride_name'],
-        event_type=profile['event_type'],
-        event_date=profile['event_date'],
-        venue=profile['venue'],
-        city=profile.get('city'),
-        invitation_message=profile.get('invitation_message'),
-        language=profile['language'],
-        design_id=design_id,  # Use EventInvitation's design or fallback
-        deity_id=deity_id,  # Use EventInvitation's deity or fallback
-        whatsapp_groom=profile.get('whatsapp_groom'),
-        whatsapp_bride=profile.get('whatsapp_bride'),
-        enabled_languages=profile.get('enabled_languages', ['english']),
-        custom_text=profile.get('custom_text', {}),
-        about_couple=profile.get('about_couple'),
-        family_details=profile.get('family_details'),
-        love_story=profile.get('love_story'),
-        cover_photo_id=profile.get('cover_photo_id'),
-        sections_enabled=SectionsEnabled(**profile['sections_enabled']),
-        background_music=BackgroundMusic(**profile.get('background_music', {'enabled': False, 'file_url': None})),
-        map_settings=MapSettings(**profile.get('map_settings', {'embed_enabled': False})),
-        contact_info=ContactInfo(**profile.get('contact_info', {})),
-        events=filtered_events,  # Show matching events
-        media=[ProfileMedia(**m) for m in media_list],
-        greetings=[GreetingResponse(**g) for g in greetings_list],
-        is_expired=is_expired
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# ==================== PHASE 11: QR CODE & CALENDAR ROUTES ====================
+# Registered before /invite/{slug}/{event_type}, which would otherwise shadow them
+
+@api_router.get("/invite/{slug}/qr")
+async def generate_qr_code(slug: str, request: Request, format: str = 'png', size: int = QR_DEFAULT_SIZE):
+    """
+    PHASE 11: Generate QR code for invitation link
+    
+    format is png or svg; size is one of QR_SIZES (pixels, or the SVG's
+    nominal width). Images are rendered once and served from the QR cache.
+    """
+    if format not in QR_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported QR format. Allowed: {', '.join(QR_MEDIA_TYPES)}")
+    if size not in QR_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unsupported QR size. Allowed: {', '.join(map(str, QR_SIZES))}")
+    
+    profile = await get_profile_summary(slug)
+    
+    if not profile:
+        raise HTTPException(status_code=404, detail="Invitation not found")
+    
+    url = invitation_url(slug)
+    
+    # The QR image is a pure function of the invitation URL, format and size
+    headers = cache_headers(make_etag("qr", QR_RENDER_VERSION, url, format, size), "public, max-age=86400")
+    if is_not_modified(request, headers['ETag']):
+        return not_modified_response(headers)
+    
+    image = await qr_store.get(url, format, size)
+    
+    return Response(content=image, media_type=QR_MEDIA_TYPES[format], headers=headers)
+
+
+@api_router.get("/invite/{slug}/calendar")
+async def download_calendar(slug: str, request: Request):
+    """PHASE 11: Generate .ics calendar file for wedding events"""
+    summary = await get_profile_summary(slug)
+    
+    if not summary:
+        raise HTTPException(status_code=404, detail="Invitation not found")
+    
+    if not await check_profile_active(summary):
+        raise HTTPException(status_code=410, detail="This invitation link has expired")
+    
+    # Calendar content only changes when the profile (and its events) is updated
+    updated_at = summary.get('updated_at')
+    if isinstance(updated_at, str):
+        updated_at = datetime.fromisoformat(updated_at)
+    headers = cache_headers(
+        make_etag("calendar", summary['id'], updated_at),
+        PUBLIC_CACHE_CONTROL,
+        updated_at
+    )
+    if is_not_modified(request, headers['ETag'], updated_at):
+        return not_modified_response(headers)
+    
+    profile = await db.profiles.find_one(
+        {"id": summary['id']},
+        {"_id": 0, "id": 1, "groom_name": 1, "bride_name": 1, "event_type": 1,
+         "event_date": 1, "venue": 1, "city": 1, "events": 1}
+    )
+    
+    # Convert date string if needed
+    if isinstance(profile.get('event_date'), str):
+        profile['event_date'] = datetime.fromisoformat(profile['event_date'])
+    
+    # Get events
+    events = profile.get('events', [])
+    
+    # Build .ics file content
+    ics_lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Wedding Invitation//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH"
+    ]
+    
+    # If events exist, use those; otherwise use main event_date
+    if events and len(events) > 0:
+        for event in events:
+            if not event.get('visible', True):
+                continue
+            
+            # Parse event date and time
+            event_date = datetime.strptime(event['date'], '%Y-%m-%d')
+            start_time_parts = event['start_time'].split(':')
+            event_datetime = event_date.replace(
+                hour=int(start_time_parts[0]),
+                minute=int(start_time_parts[1])
+            )
+            
+            # End time (default to 2 hours later if not specified)
+            if event.get('end_time'):
+                end_time_parts = event['end_time'].split(':')
+                end_datetime = event_date.replace(
+                    hour=int(end_time_parts[0]),
+                    minute=int(end_time_parts[1])
+                )
+            else:
+                end_datetime = event_datetime + timedelta(hours=2)
+            
+            # Format dates for .ics
+            dtstart = event_datetime.strftime('%Y%m%dT%H%M%S')
+            dtend = end_datetime.strftime('%Y%m%dT%H%M%S')
+            
+            ics_lines.extend([
+                "BEGIN:VEVENT",
+                f"UID:{event.get('event_id', str(uuid.uuid4()))}@wedding-invitation",
+                f"DTSTAMP:{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+                f"DTSTART:{dtstart}",
+                f"DTEND:{dtend}",
+                f"SUMMARY:{event['name']} - {profile['groom_name']} & {profile['bride_name']}",
+                f"LOCATION:{event['venue_name']}, {event['venue_address']}",
+                f"DESCRIPTION:{event.get('description', '')}",
+                "STATUS:CONFIRMED",
+                "END:VEVENT"
+            ])
+    else:
+        # Use main event_date
+        event_datetime = profile['event_date']
+        end_datetime = event_datetime + timedelta(hours=4)
+        
+        dtstart = event_datetime.strftime('%Y%m%dT%H%M%S')
+        dtend = end_datetime.strftime('%Y%m%dT%H%M%S')
+        
+        ics_lines.extend([
+            "BEGIN:VEVENT",
+            f"UID:{profile['id']}@wedding-invitation",
+            f"DTSTAMP:{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+            f"DTSTART:{dtstart}",
+            f"DTEND:{dtend}",
+            f"SUMMARY:{profile['event_type'].title()} - {profile['groom_name']} & {profile['bride_name']}",
+            f"LOCATION:{profile['venue']}, {profile.get('city', '')}",
+            f"DESCRIPTION:Join us for our {profile['event_type']}",
+            "STATUS:CONFIRMED",
+            "END:VEVENT"
+        ])
+    
+    ics_lines.append("END:VCALENDAR")
+    ics_content = "\r\n".join(ics_lines)
+    
+    # Return as downloadable file
+    from fastapi.responses import Response
+    filename = f"wedding-{profile['groom_name']}-{profile['bride_name']}.ics".replace(" ", "-").lower()
+    
+    return Response(
+        content=ics_content,
+        media_type="text/calendar",
+        headers={
+            **headers,
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        }
     )
 
 
+# ==================== PUBLIC INVITATION ROUTES ====================
+
+@api_router.get("/invite/{slug}", response_model=InvitationPublicView)
+async def get_invitation(slug: str, request: Request):
+    """Get public invitation by slug (served from the published snapshot)"""
+    snapshot = await get_invitation_snapshot(slug)
+    return await invitation_snapshot_response(snapshot, request)
+
+
+@api_router.get("/invite/{slug}/{event_type}", response_model=InvitationPublicView)
+async def get_event_invitation(slug: str, event_type: str, request: Request):
+    """Get public invitation for specific event (served from the published snapshot)
+    
+    NEW: Checks EventInvitation first (dedicated event invitation links)
+    FALLBACK: Falls back to WeddingEvent within profile (PHASE 13 legacy)
+    """
+    # Validate event type
+    event_type_lower = event_type.lower()
+    if event_type_lower not in VALID_EVENT_TYPES:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid event type. Must be one of: {', '.join(VALID_EVENT_TYPES)}"
+        )
+    
+    snapshot = await get_invitation_snapshot(slug, event_type_lower)
+    return await invitation_snapshot_response(snapshot, request)
+
+
 @api_router.post("/invite/{slug}/greetings", response_model=GreetingResponse)
 async def submit_greeting(slug: str, greeting_data: GreetingCreate, request: Request):
     """Submit greeting for invitation - PHASE 11: Default status is 'pending' for moderation"""
     # PHASE 12 - PART 4: Rate limiting - 3 wishes per IP per day
+    # Rate limit check and profile lookup are independent, so run them concurrently
     client_ip = get_client_ip(request)
-    if not await check_rate_limit(client_ip, "wishes", 3):
-        raise HTTPException(
-            status_code=429,
-            detail="You have exceeded the maximum number of wishes submissions for today. Please try again tomorrow."
+    rate_limit, profile = await asyncio.gather(
+        check_rate_limit(client_ip, "wishes", 3),
+        get_profile_summary(slug)
+    )
+    if not rate_limit.allowed:
+        raise rate_limit_exceeded(
+            rate_limit,
+            "You have exceeded the maximum number of wishes submissions for today. Please try again tomorrow."
         )
     
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
-    
     if not profile:
         raise HTTPException(status_code=404, detail="Invitation not found")
     
@@ -1553,39 +2117,50 @@ async def get_profile_greetings(
 @api_router.put("/admin/greetings/{greeting_id}/approve")
 async def approve_greeting(greeting_id: str, admin_id: str = Depends(get_current_admin)):
     """PHASE 11: Approve a greeting"""
-    result = await db.greetings.update_one(
+    greeting = await db.greetings.find_one_and_update(
         {"id": greeting_id},
-        {"$set": {"approval_status": "approved"}}
+        {"$set": {"approval_status": "approved"}},
+        projection={"_id": 0, "profile_id": 1}
     )
     
-    if result.matched_count == 0:
+    if not greeting:
         raise HTTPException(status_code=404, detail="Greeting not found")
     
+    await refresh_public_invitation(greeting.get('profile_id'))
+    
     return {"message": "Greeting approved successfully"}
 
 
 @api_router.put("/admin/greetings/{greeting_id}/reject")
 async def reject_greeting(greeting_id: str, admin_id: str = Depends(get_current_admin)):
     """PHASE 11: Reject a greeting"""
-    result = await db.greetings.update_one(
+    greeting = await db.greetings.find_one_and_update(
         {"id": greeting_id},
-        {"$set": {"approval_status": "rejected"}}
+        {"$set": {"approval_status": "rejected"}},
+        projection={"_id": 0, "profile_id": 1}
     )
     
-    if result.matched_count == 0:
+    if not greeting:
         raise HTTPException(status_code=404, detail="Greeting not found")
     
+    await refresh_public_invitation(greeting.get('profile_id'))
+    
     return {"message": "Greeting rejected successfully"}
 
 
 @api_router.delete("/admin/greetings/{greeting_id}")
 async def delete_greeting(greeting_id: str, admin_id: str = Depends(get_current_admin)):
     """PHASE 11: Delete a greeting"""
-    result = await db.greetings.delete_one({"id": greeting_id})
+    deleted = await db.greetings.find_one_and_delete(
+        {"id": greeting_id},
+        projection={"_id": 0, "profile_id": 1}
+    )
     
-    if result.deleted_count == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Greeting not found")
     
+    await refresh_public_invitation(deleted.get('profile_id'))
+    
     return {"message": "Greeting deleted successfully"}
 
 
@@ -1595,16 +2170,18 @@ async def delete_greeting(greeting_id: str, admin_id: str = Depends(get_current_
 async def submit_rsvp(slug: str, rsvp_data: RSVPCreate, request: Request):
     """Submit RSVP for invitation (public endpoint)"""
     # PHASE 12 - PART 4: Rate limiting - 5 RSVPs per IP per day
+    # Rate limit check and profile lookup run concurrently
     client_ip = get_client_ip(request)
-    if not await check_rate_limit(client_ip, "rsvp", 5):
-        raise HTTPException(
-            status_code=429,
-            detail="You have exceeded the maximum number of RSVP submissions for today. Please try again tomorrow."
+    rate_limit, profile = await asyncio.gather(
+        check_rate_limit(client_ip, "rsvp", 5),
+        get_profile_summary(slug)
+    )
+    if not rate_limit.allowed:
+        raise rate_limit_exceeded(
+            rate_limit,
+            "You have exceeded the maximum number of RSVP submissions for today. Please try again tomorrow."
         )
     
-    # Find profile by slug
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
-    
     if not profile:
         raise HTTPException(status_code=404, detail="Invitation not found")
     
@@ -1692,7 +2269,7 @@ async def submit_rsvp(slug: str, rsvp_data: RSVPCreate, request: Request):
 async def check_rsvp_status(slug: str, phone: str):
     """PHASE 11: Check if RSVP exists and if it can be edited"""
     # Find profile by slug
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
+    profile = await get_profile_summary(slug)
     
     if not profile:
         raise HTTPException(status_code=404, detail="Invitation not found")
@@ -1888,121 +2465,47 @@ async def export_rsvps_csv(profile_id: str, admin_id: str = Depends(get_current_
 
 # ==================== ANALYTICS ROUTES (PHASE 9 - ENHANCED) ====================
 
+# Interaction type -> analytics counter field
+INTERACTION_COUNTERS = {
+    "map_click": "map_clicks",
+    "rsvp_click": "rsvp_clicks",
+    "music_play": "music_plays",
+    "music_pause": "music_pauses"
+}
+
+
+def get_daily_views(analytics_doc: dict, days: int = 30) -> List[dict]:
+    """
+    Daily view counts for the most recent days, oldest first
+    
+    Merges per-day keyed counters with the legacy daily_views array.
+    """
+    counts: Dict[str, int] = {}
+    for dv in analytics_doc.get('daily_views', []):
+        counts[dv['date']] = counts.get(dv['date'], 0) + dv.get('count', 0)
+    for date, count in analytics_doc.get('daily_view_counts', {}).items():
+        counts[date] = counts.get(date, 0) + count
+    
+    recent_dates = sorted(counts)[-days:]
+    return [{"date": date, "count": counts[date]} for date in recent_dates]
+
+
 @api_router.post("/invite/{slug}/view", status_code=204)
 async def track_invitation_view(slug: str, view_data: ViewTrackingRequest):
     """Track invitation view with session-based unique visitor tracking (Phase 9)"""
     # Find profile by slug
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
+    profile = await get_profile_summary(slug)
     
     if not profile:
         raise HTTPException(status_code=404, detail="Invitation not found")
     
-    profile_id = profile['id']
-    now = datetime.now(timezone.utc)
-    current_date = now.date().isoformat()
-    current_hour = str(now.hour)
-    
-    # Check if session exists and is valid (24-hour window)
-    existing_session = await db.view_sessions.find_one({
-        "session_id": view_data.session_id,
-        "profile_id": profile_id,
-        "expires_at": {"$gt": now.isoformat()}
-    })
-    
-    is_unique_view = existing_session is None
-    
-    # If no valid session exists, create one
-    if is_unique_view:
-        session = ViewSession(
-            session_id=view_data.session_id,
-            profile_id=profile_id,
-            device_type=view_data.device_type,
-            created_at=now,
-            expires_at=now + timedelta(hours=24)
-        )
-        
-        session_doc = session.model_dump()
-        session_doc['created_at'] = session_doc['created_at'].isoformat()
-        session_doc['expires_at'] = session_doc['expires_at'].isoformat()
-        
-        await db.view_sessions.insert_one(session_doc)
-    
-    # Find or create analytics document
-    analytics_doc = await db.analytics.find_one({"profile_id": profile_id}, {"_id": 0})
-    
-    if analytics_doc:
-        # Update existing analytics
-        update_data = {
-            "total_views": analytics_doc.get('total_views', 0) + 1,
-            "last_viewed_at": now.isoformat()
-        }
-        
-        # Update unique views if new session
-        if is_unique_view:
-            update_data["unique_views"] = analytics_doc.get('unique_views', 0) + 1
-            
-            # Set first_viewed_at if not set
-            if not analytics_doc.get('first_viewed_at'):
-                update_data["first_viewed_at"] = now.isoformat()
-        
-        # Increment device-specific counter
-        if view_data.device_type == "mobile":
-            update_data["mobile_views"] = analytics_doc.get('mobile_views', 0) + 1
-        elif view_data.device_type == "desktop":
-            update_data["desktop_views"] = analytics_doc.get('desktop_views', 0) + 1
-        elif view_data.device_type == "tablet":
-            update_data["tablet_views"] = analytics_doc.get('tablet_views', 0) + 1
-        
-        # Update hourly distribution
-        hourly_dist = analytics_doc.get('hourly_distribution', {})
-        hourly_dist[current_hour] = hourly_dist.get(current_hour, 0) + 1
-        update_data["hourly_distribution"] = hourly_dist
-        
-        # Update daily views (keep last 30 days)
-        daily_views = analytics_doc.get('daily_views', [])
-        today_entry = next((dv for dv in daily_views if dv['date'] == current_date), None)
-        
-        if today_entry:
-            today_entry['count'] += 1
-        else:
-            daily_views.append({"date": current_date, "count": 1})
-        
-        # Keep only last 30 days
-        if len(daily_views) > 30:
-            daily_views = sorted(daily_views, key=lambda x: x['date'], reverse=True)[:30]
-        
-        update_data["daily_views"] = daily_views
-        
-        await db.analytics.update_one(
-            {"profile_id": profile_id},
-            {"$set": update_data}
-        )
-    else:
-        # Create new analytics document
-        analytics = Analytics(
-            profile_id=profile_id,
-            total_views=1,
-            unique_views=1 if is_unique_view else 0,
-            mobile_views=1 if view_data.device_type == "mobile" else 0,
-            desktop_views=1 if view_data.device_type == "desktop" else 0,
-            tablet_views=1 if view_data.device_type == "tablet" else 0,
-            first_viewed_at=now,
-            last_viewed_at=now,
-            daily_views=[{"date": current_date, "count": 1}],
-            hourly_distribution={current_hour: 1},
-            language_views={},
-            map_clicks=0,
-            rsvp_clicks=0,
-            music_plays=0,
-            music_pauses=0
-        )
-        
-        doc = analytics.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        doc['first_viewed_at'] = doc['first_viewed_at'].isoformat()
-        doc['last_viewed_at'] = doc['last_viewed_at'].isoformat()
-        
-        await db.analytics.insert_one(doc)
+    # Buffered: counters and unique sessions are written by the periodic flush
+    analytics_buffer.record_view(
+        profile['id'],
+        view_data.session_id,
+        view_data.device_type,
+        datetime.now(timezone.utc)
+    )
     
     # Return 204 No Content for fast response
     return None
@@ -2012,24 +2515,17 @@ async def track_invitation_view(slug: str, view_data: ViewTrackingRequest):
 async def track_language_view(slug: str, language_data: LanguageTrackingRequest):
     """Track language selection (public endpoint, Phase 9)"""
     # Find profile by slug
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
+    profile = await get_profile_summary(slug)
     
     if not profile:
         raise HTTPException(status_code=404, detail="Invitation not found")
     
-    profile_id = profile['id']
-    
-    # Update analytics with language view
-    analytics_doc = await db.analytics.find_one({"profile_id": profile_id}, {"_id": 0})
-    
-    if analytics_doc:
-        language_views = analytics_doc.get('language_views', {})
-        language_views[language_data.language_code] = language_views.get(language_data.language_code, 0) + 1
-        
-        await db.analytics.update_one(
-            {"profile_id": profile_id},
-            {"$set": {"language_views": language_views}}
-        )
+    # Update analytics with language view (buffered)
+    analytics_buffer.record_counter(
+        profile['id'],
+        f"language_views.{language_data.language_code}",
+        datetime.now(timezone.utc)
+    )
     
     return None
 
@@ -2038,33 +2534,17 @@ async def track_language_view(slug: str, language_data: LanguageTrackingRequest)
 async def track_interaction(slug: str, interaction_data: InteractionTrackingRequest):
     """Track user interactions (public endpoint, Phase 9)"""
     # Find profile by slug
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
+    profile = await get_profile_summary(slug)
     
     if not profile:
         raise HTTPException(status_code=404, detail="Invitation not found")
     
-    profile_id = profile['id']
-    
-    # Update analytics with interaction
-    analytics_doc = await db.analytics.find_one({"profile_id": profile_id}, {"_id": 0})
-    
-    if analytics_doc:
-        update_data = {}
-        
-        if interaction_data.interaction_type == "map_click":
-            update_data["map_clicks"] = analytics_doc.get('map_clicks', 0) + 1
-        elif interaction_data.interaction_type == "rsvp_click":
-            update_data["rsvp_clicks"] = analytics_doc.get('rsvp_clicks', 0) + 1
-        elif interaction_data.interaction_type == "music_play":
-            update_data["music_plays"] = analytics_doc.get('music_plays', 0) + 1
-        elif interaction_data.interaction_type == "music_pause":
-            update_data["music_pauses"] = analytics_doc.get('music_pauses', 0) + 1
-        
-        if update_data:
-            await db.analytics.update_one(
-                {"profile_id": profile_id},
-                {"$set": update_data}
-            )
+    # Update analytics with interaction (buffered)
+    analytics_buffer.record_counter(
+        profile['id'],
+        INTERACTION_COUNTERS[interaction_data.interaction_type],
+        datetime.now(timezone.utc)
+    )
     
     return None
 
@@ -2111,8 +2591,7 @@ async def get_profile_analytics(profile_id: str, admin_id: str = Depends(get_cur
         last_viewed = datetime.fromisoformat(last_viewed)
     
     # Convert daily_views to DailyView objects
-    daily_views_data = analytics_doc.get('daily_views', [])
-    daily_views = [DailyView(**dv) if isinstance(dv, dict) else dv for dv in daily_views_data]
+    daily_views = [DailyView(**dv) for dv in get_daily_views(analytics_doc)]
     
     return AnalyticsResponse(
         profile_id=analytics_doc['profile_id'],
@@ -2159,7 +2638,7 @@ async def get_analytics_summary(profile_id: str, date_range: str = "7d", admin_i
         )
     
     # Apply date range filter for daily views
-    daily_views = analytics_doc.get('daily_views', [])
+    daily_views = get_daily_views(analytics_doc)
     if date_range != "all" and daily_views:
         cutoff_date = (datetime.now(timezone.utc) - timedelta(days=int(date_range[:-1]))).date().isoformat()
         daily_views = [dv for dv in daily_views if dv['date'] >= cutoff_date]
@@ -2193,350 +2672,60 @@ async def get_analytics_summary(profile_id: str, date_range: str = "7d", admin_i
 
 # ==================== PDF GENERATION ====================
 
-# Design theme color mappings for PDF
-THEME_COLORS = {
-    'temple_divine': {'primary': (139, 115, 85), 'secondary': (212, 175, 55), 'text': (74, 55, 40), 'bg': (255, 248, 231)},
-    'royal_classic': {'primary': (139, 0, 0), 'secondary': (255, 215, 0), 'text': (74, 26, 26), 'bg': (255, 245, 230)},
-    'floral_soft': {'primary': (255, 182, 193), 'secondary': (255, 218, 185), 'text': (107, 78, 113), 'bg': (255, 240, 245)},
-    'cinematic_luxury': {'primary': (26, 26, 26), 'secondary': (212, 175, 55), 'text': (245, 245, 245), 'bg': (44, 44, 44)},
-    'heritage_scroll': {'primary': (139, 90, 43), 'secondary': (205, 133, 63), 'text': (74, 48, 23), 'bg': (250, 240, 230)},
-    'minimal_elegant': {'primary': (128, 128, 128), 'secondary': (169, 169, 169), 'text': (64, 64, 64), 'bg': (255, 255, 255)},
-    'modern_premium': {'primary': (47, 79, 79), 'secondary': (72, 209, 204), 'text': (245, 245, 245), 'bg': (32, 32, 32)},
-    'artistic_handcrafted': {'primary': (160, 82, 45), 'secondary': (210, 180, 140), 'text': (101, 67, 33), 'bg': (255, 250, 240)}
-}
-
-# Language templates for PDF
-LANGUAGE_TEMPLATES = {
-    'english': {
-        'opening_title': 'Wedding Invitation',
-        'couple_label': 'Join us in celebrating the union of',
-        'events_title': 'Event Schedule',
-        'date_label': 'Date',
-        'time_label': 'Time',
-        'venue_label': 'Venue',
-        'contact_title': 'Contact Information',
-        'groom_label': 'Groom',
-        'bride_label': 'Bride'
-    },
-    'telugu': {
-        'opening_title': 'వివాహ ఆహ్వానం',
-        'couple_label': 'మా వివాహ వేడుకలో పాల్గొనండి',
-        'events_title': 'కార్యక్రమ షెడ్యూల్',
-        'date_label': 'తేదీ',
-        'time_label': 'సమయం',
-        'venue_label': 'స్థలం',
-        'contact_title': 'సంప్రదించండి',
-        'groom_label': 'వరుడు',
-        'bride_label': 'వధువు'
-    },
-    'hindi': {
-        'opening_title': 'विवाह निमंत्रण',
-        'couple_label': 'हमारे विवाह समारोह में शामिल हों',
-        'events_title': 'कार्यक्रम कार्यक्रम',
-        'date_label': 'तारीख',
-        'time_label': 'समय',
-        'venue_label': 'स्थान',
-        'contact_title': 'संपर्क जानकारी',
-        'groom_label': 'वर',
-        'bride_label': 'वधू'
-    },
-    'tamil': {
-        'opening_title': 'திருமண அழைப்பிதழ்',
-        'couple_label': 'எங்கள் திருமண நிகழ்வில் சேரவும்',
-        'events_title': 'நிகழ்வு அட்டவணை',
-        'date_label': 'தேதி',
-        'time_label': 'நேரம்',
-        'venue_label': 'இடம்',
-        'contact_title': 'தொடர்பு தகவல்',
-        'groom_label': 'மணமகன்',
-        'bride_label': 'மணமகள்'
-    },
-    'kannada': {
-        'opening_title': 'ಮದುವೆ ಆಮಂತ್ರಣ',
-        'couple_label': 'ನಮ್ಮ ಮದುವೆ ಸಮಾರಂಭದಲ್ಲಿ ಸೇರಿ',
-        'events_title': 'ಕಾರ್ಯಕ್ರಮದ ವೇಳಾಪಟ್ಟಿ',
-        'date_label': 'ದಿನಾಂಕ',
-        'time_label': 'ಸಮಯ',
-        'venue_label': 'ಸ್ಥಳ',
-        'contact_title': 'ಸಂಪರ್ಕ ಮಾಹಿತಿ',
-        'groom_label': 'ವರ',
-        'bride_label': 'ವಧು'
-    },
-    'malayalam': {
-        'opening_title': 'വിവാഹ ക്ഷണം',
-        'couple_label': 'ഞങ്ങളുടെ വിവാഹ ചടങ്ങിൽ പങ്കെടുക്കൂ',
-        'events_title': 'പരിപാടി ഷെഡ്യൂൾ',
-        'date_label': 'തീയതി',
-        'time_label': 'സമയം',
-        'venue_label': 'സ്ഥലം',
-        'contact_title': 'ബന്ധപ്പെടുക',
-        'groom_label': 'വരൻ',
-        'bride_label': 'വധു'
-    }
-}
-
-
-def get_theme_colors(design_id: str):
-    """Get theme colors for PDF generation"""
-    return THEME_COLORS.get(design_id, THEME_COLORS['royal_classic'])
-
-
-def get_language_text(language: str):
-    """Get language-specific text for PDF"""
-    return LANGUAGE_TEMPLATES.get(language, LANGUAGE_TEMPLATES['english'])
+async def run_in_pdf_pool(fn, *args) -> bytes:
+    """Run a PDF rendering function in the PDF worker pool with a time limit"""
+    try:
+        return await pdf_pool.run(fn, *args, timeout=PDF_RENDER_TIMEOUT_SECONDS)
+    except WorkerPoolBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF generation is busy. Please try again shortly.",
+            headers={"Retry-After": "10"}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="PDF generation timed out")
 
 
-def rgb_to_reportlab_color(rgb_tuple):
-    """Convert RGB tuple to ReportLab color"""
-    r, g, b = rgb_tuple
-    return rl_colors.Color(r/255.0, g/255.0, b/255.0)
+async def render_invitation_pdf(profile: dict, language: str) -> bytes:
+    """Render an invitation PDF in the PDF worker pool"""
+    return await run_in_pdf_pool(generate_invitation_pdf, profile, language)
 
 
-async def generate_invitation_pdf(profile: dict, language: str = 'english'):
-    """Generate PDF invitation from profile data"""
-    buffer = io.BytesIO()
-    
-    # Get theme colors and language text
-    theme = get_theme_colors(profile.get('design_id', 'royal_classic'))
-    lang_text = get_language_text(language)
-    
-    # Convert colors
-    primary_color = rgb_to_reportlab_color(theme['primary'])
-    secondary_color = rgb_to_reportlab_color(theme['secondary'])
-    text_color = rgb_to_reportlab_color(theme['text'])
-    
-    # Get deity background path if present
-    deity_id = profile.get('deity_id')
-    deity_bg_path = None
-    if deity_id and deity_id != 'none':
-        # Map deity IDs to local file paths
-        deity_file_map = {
-            'ganesha': '/app/frontend/public/assets/deities/ganesha_desktop.jpg',
-            'venkateswara_padmavati': '/app/frontend/public/assets/deities/venkateswara_padmavati_desktop.jpg',
-            'shiva_parvati': '/app/frontend/public/assets/deities/shiva_parvati_desktop.jpg',
-            'lakshmi_vishnu': '/app/frontend/public/assets/deities/lakshmi_vishnu_desktop.jpg'
-        }
-        deity_bg_path = deity_file_map.get(deity_id)
-    
-    # Create PDF document
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=0.75*inch,
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch,
-        bottomMargin=0.75*inch
-    )
-    
-    # Container for PDF elements
-    story = []
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=28,
-        textColor=primary_color,
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Heading style
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=18,
-        textColor=secondary_color,
-        spaceAfter=12,
-        spaceBefore=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Subheading style
-    subheading_style = ParagraphStyle(
-        'CustomSubHeading',
-        parent=styles['Heading3'],
-        fontSize=14,
-        textColor=primary_color,
-        spaceAfter=8,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Body style
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=text_color,
-        spaceAfter=6,
-        alignment=TA_LEFT,
-        fontName='Helvetica'
-    )
-    
-    # Center body style
-    center_body_style = ParagraphStyle(
-        'CustomCenterBody',
-        parent=body_style,
-        alignment=TA_CENTER
+async def get_invitation_pdf(profile: dict, language: str, regenerate: bool = False) -> bytes:
+    """Cached invitation PDF for the profile's current version, rendered on a miss"""
+    cache_key = pdf_cache_key(
+        profile['id'], profile.get('updated_at'), profile.get('design_id'), language,
+        language_font_version(language)
     )
+    pdf_data = None if regenerate else await pdf_cache.get(profile['id'], cache_key)
     
-    # Add title
-    story.append(Paragraph(lang_text['opening_title'], title_style))
-    story.append(Spacer(1, 0.3*inch))
+    if pdf_data is None:
+        pdf_data = await render_invitation_pdf(profile, language)
+        await pdf_cache.set(profile['id'], cache_key, pdf_data)
     
-    # Add couple names
-    story.append(Paragraph(lang_text['couple_label'], center_body_style))
-    story.append(Spacer(1, 0.2*inch))
-    
-    couple_text = f"<b>{profile['groom_name']}</b> & <b>{profile['bride_name']}</b>"
-    story.append(Paragraph(couple_text, heading_style))
-    story.append(Spacer(1, 0.4*inch))
-    
-    # Add events section
-    events = profile.get('events', [])
-    visible_events = [e for e in events if e.get('visible', True)]
-    
-    if visible_events:
-        story.append(Paragraph(lang_text['events_title'], heading_style))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Sort events by date
-        sorted_events = sorted(visible_events, key=lambda x: x.get('date', ''))
-        
-        for event in sorted_events:
-            # Event name
-            event_name_style = ParagraphStyle(
-                'EventName',
-                parent=subheading_style,
-                fontSize=14,
-                textColor=primary_color,
-                alignment=TA_LEFT
-            )
-            story.append(Paragraph(f"<b>{event['name']}</b>", event_name_style))
-            story.append(Spacer(1, 0.1*inch))
-            
-            # Event details
-            date_str = event.get('date', '')
-            time_str = event.get('start_time', '')
-            if event.get('end_time'):
-                time_str += f" - {event['end_time']}"
-            
-            story.append(Paragraph(f"<b>{lang_text['date_label']}:</b> {date_str}", body_style))
-            story.append(Paragraph(f"<b>{lang_text['time_label']}:</b> {time_str}", body_style))
-            story.append(Paragraph(f"<b>{lang_text['venue_label']}:</b> {event.get('venue_name', '')}", body_style))
-            story.append(Paragraph(f"{event.get('venue_address', '')}", body_style))
-            
-            if event.get('description'):
-                story.append(Spacer(1, 0.05*inch))
-                story.append(Paragraph(event['description'], body_style))
-            
-            story.append(Spacer(1, 0.25*inch))
-    
-    # Add contact information
-    if profile.get('whatsapp_groom') or profile.get('whatsapp_bride'):
-        story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph(lang_text['contact_title'], heading_style))
-        story.append(Spacer(1, 0.15*inch))
-        
-        if profile.get('whatsapp_groom'):
-            story.append(Paragraph(
-                f"<b>{lang_text['groom_label']}:</b> {profile['whatsapp_groom']}", 
-                body_style
-            ))
-        
-        if profile.get('whatsapp_bride'):
-            story.append(Paragraph(
-                f"<b>{lang_text['bride_label']}:</b> {profile['whatsapp_bride']}", 
-                body_style
-            ))
-    
-    # Build PDF with deity background if present
-    if deity_bg_path and os.path.exists(deity_bg_path):
-        def add_deity_background(canvas_obj, doc_obj):
-            """Add deity background with very light opacity"""
-            canvas_obj.saveState()
-            try:
-                # Load and compress deity image
-                img = PILImage.open(deity_bg_path)
-                
-                # Resize to optimize file size (max 800px width)
-                max_width = 800
-                if img.width > max_width:
-                    ratio = max_width / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((max_width, new_height), PILImage.Resampling.LANCZOS)
-                
-                # Convert to RGB if needed
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Save compressed image to buffer
-                img_buffer = io.BytesIO()
-                img.save(img_buffer, format='JPEG', quality=70, optimize=True)
-                img_buffer.seek(0)
-                
-                # Create ReportLab Image
-                img_reader = ImageReader(img_buffer)
-                
-                # Calculate centered position
-                page_width, page_height = A4
-                img_width, img_height = img.size
-                
-                # Scale to fit page while maintaining aspect ratio
-                scale = min(page_width / img_width, page_height / img_height)
-                scaled_width = img_width * scale
-                scaled_height = img_height * scale
-                
-                # Center on page
-                x = (page_width - scaled_width) / 2
-                y = (page_height - scaled_height) / 2
-                
-                # Draw with very light opacity (0.12)
-                canvas_obj.setFillAlpha(0.12)
-                canvas_obj.drawImage(
-                    img_reader, 
-                    x, y, 
-                    width=scaled_width, 
-                    height=scaled_height,
-                    preserveAspectRatio=True,
-                    mask='auto'
-                )
-            except Exception as e:
-                # If deity image fails, continue without it
-                logging.warning(f"Failed to add deity background: {e}")
-            finally:
-                canvas_obj.restoreState()
-        
-        doc.build(story, onFirstPage=add_deity_background, onLaterPages=add_deity_background)
-    else:
-        doc.build(story)
-    
-    # Get PDF data
-    buffer.seek(0)
-    return buffer
+    return pdf_data
 
 
 @api_router.get("/admin/profiles/{profile_id}/download-pdf")
 async def download_invitation_pdf(
     profile_id: str, 
     language: str = 'english',
+    regenerate: bool = False,
     admin_id: str = Depends(get_current_admin)
 ):
-    """Generate and download PDF invitation (admin only)"""
+    """
+    Generate and download PDF invitation (admin only)
+    
+    Rendered PDFs are cached per profile version, design and language;
+    pass regenerate=1 to force a fresh render.
+    """
     # Fetch profile
     profile = await db.profiles.find_one({"id": profile_id}, {"_id": 0})
     
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
-    # Generate PDF
-    pdf_buffer = await generate_invitation_pdf(profile, language)
+    pdf_data = await get_invitation_pdf(profile, language, regenerate=regenerate)
     
     # Create filename
     groom_name = re.sub(r'[^a-zA-Z]', '', profile['groom_name'].split()[0].lower())
@@ -2544,8 +2733,8 @@ async def download_invitation_pdf(
     filename = f"wedding-invitation-{groom_name}-{bride_name}.pdf"
     
     # Return PDF as download
-    return StreamingResponse(
-        pdf_buffer,
+    return Response(
+        content=pdf_data,
         media_type="application/pdf",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
@@ -2553,6 +2742,113 @@ async def download_invitation_pdf(
     )
 
 
+@api_router.get("/admin/profiles/{profile_id}/qr-sheet")
+async def download_qr_sheet(profile_id: str, admin_id: str = Depends(get_current_admin)):
+    """
+    Printable PDF of QR codes for the main invitation link and every event link (admin only)
+    
+    Event links are the profile's visible events plus its enabled event
+    invitations, in VALID_EVENT_TYPES order.
+    """
+    profile, event_invitations = await asyncio.gather(
+        db.profiles.find_one(
+            {"id": profile_id},
+            {"_id": 0, "slug": 1, "groom_name": 1, "bride_name": 1, "events": 1}
+        ),
+        db.event_invitations.find(
+            {"profile_id": profile_id, "enabled": True},
+            {"_id": 0, "event_type": 1}
+        ).to_list(len(VALID_EVENT_TYPES))
+    )
+    
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    slug = profile['slug']
+    event_types = set(generate_event_links(slug, profile.get('events', [])))
+    event_types.update(ei['event_type'] for ei in event_invitations)
+    
+    entries = [("Wedding Invitation", invitation_url(slug))]
+    entries.extend(
+        (event_type.capitalize(), invitation_url(slug, event_type))
+        for event_type in VALID_EVENT_TYPES if event_type in event_types
+    )
+    
+    title = f"{profile['groom_name']} & {profile['bride_name']}"
+    pdf_data = await run_in_pdf_pool(render_qr_sheet, title, entries)
+    
+    return Response(
+        content=pdf_data,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=qr-codes-{slug}.pdf"
+        }
+    )
+
+
+@api_router.post("/admin/pdf-exports", response_model=PdfExportStatus)
+async def create_pdf_export(export_data: PdfExportRequest, admin_id: str = Depends(get_current_admin)):
+    """
+    Start a bulk PDF export for profiles x languages (admin only)
+    
+    Without languages, each profile is exported in all of its enabled languages.
+    Poll GET /admin/pdf-exports/{job_id} for progress; the ZIP download can
+    start right away and receives files as they finish rendering.
+    """
+    profile_ids = list(dict.fromkeys(export_data.profile_ids))
+    profiles = await db.profiles.find({"id": {"$in": profile_ids}}, {"_id": 0}).to_list(len(profile_ids))
+    profiles_by_id = {profile['id']: profile for profile in profiles}
+    
+    items = []
+    errors = []
+    for profile_id in profile_ids:
+        profile = profiles_by_id.get(profile_id)
+        if not profile:
+            errors.append({"profile_id": profile_id, "language": None, "error": "Profile not found"})
+            continue
+        for language in export_data.languages or profile.get('enabled_languages') or ['english']:
+            items.append((profile, language))
+    
+    job = pdf_exports.create(items, errors)
+    return job.status()
+
+
+@api_router.get("/admin/pdf-exports/{job_id}", response_model=PdfExportStatus)
+async def get_pdf_export(job_id: str, admin_id: str = Depends(get_current_admin)):
+    """Bulk PDF export progress (admin only)"""
+    job = pdf_exports.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job.status()
+
+
+@api_router.get("/admin/pdf-exports/{job_id}/download")
+async def download_pdf_export(job_id: str, admin_id: str = Depends(get_current_admin)):
+    """Stream the export as a ZIP, including files still being rendered (admin only)"""
+    job = pdf_exports.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    
+    return StreamingResponse(
+        pdf_exports.stream_zip(job),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename=wedding-invitations-{job.id[:8]}.zip"
+        }
+    )
+
+
+# ==================== WORKER METRICS ====================
+
+@api_router.get("/admin/metrics/workers")
+async def get_worker_metrics(admin_id: str = Depends(get_current_admin)):
+    """Queue depth and job timings of the image and PDF worker pools (this server process)"""
+    return {
+        "image": image_pool.stats(),
+        "pdf": pdf_pool.stats()
+    }
+
+
 # ==================== CONFIGURATION ROUTES ====================
 
 @api_router.get("/config/designs")
@@ -2667,146 +2963,21 @@ async def get_languages():
 
 
 
-# ==================== PHASE 11: QR CODE & CALENDAR ROUTES ====================
-
-@api_router.get("/invite/{slug}/qr")
-async def generate_qr_code(slug: str):
-    """PHASE 11: Generate QR code for invitation link"""
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
-    
-    if not profile:
-        raise HTTPException(status_code=404, detail="Invitation not found")
-    
-    # Build invitation URL
-    invitation_url = f"https://marry-mate-14.preview.emergentagent.com/invite/{slug}"
-    
-    # Create QR code
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(invitation_url)
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Convert to bytes
-    img_bytes = BytesIO()
-    img.save(img_bytes, format='PNG')
-    img_bytes.seek(0)
-    
-    return StreamingResponse(img_bytes, media_type="image/png")
-
-
-@api_router.get("/invite/{slug}/calendar")
-async def download_calendar(slug: str):
-    """PHASE 11: Generate .ics calendar file for wedding events"""
-    profile = await db.profiles.find_one({"slug": slug}, {"_id": 0})
-    
-    if not profile:
-        raise HTTPException(status_code=404, detail="Invitation not found")
-    
-    if not await check_profile_active(profile):
-        raise HTTPException(status_code=410, detail="This invitation link has expired")
-    
-    # Convert date string if needed
-    if isinstance(profile.get('event_date'), str):
-        profile['event_date'] = datetime.fromisoformat(profile['event_date'])
-    
-    # Get events
-    events = profile.get('events', [])
-    
-    # Build .ics file content
-    ics_lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//Wedding Invitation//EN",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH"
-    ]
-    
-    # If events exist, use those; otherwise use main event_date
-    if events and len(events) > 0:
-        for event in events:
-            if not event.get('visible', True):
-                continue
-            
-            # Parse event date and time
-            event_date = datetime.strptime(event['date'], '%Y-%m-%d')
-            start_time_parts = event['start_time'].split(':')
-            event_datetime = event_date.replace(
-                hour=int(start_time_parts[0]),
-                minute=int(start_time_parts[1])
-            )
-            
-            # End time (default to 2 hours later if not specified)
-            if event.get('end_time'):
-                end_time_parts = event['end_time'].split(':')
-                end_datetime = event_date.replace(
-                    hour=int(end_time_parts[0]),
-                    minute=int(end_time_parts[1])
-                )
-            else:
-                end_datetime = event_datetime + timedelta(hours=2)
-            
-            # Format dates for .ics
-            dtstart = event_datetime.strftime('%Y%m%dT%H%M%S')
-            dtend = end_datetime.strftime('%Y%m%dT%H%M%S')
-            
-            ics_lines.extend([
-                "BEGIN:VEVENT",
-                f"UID:{event.get('event_id', str(uuid.uuid4()))}@wedding-invitation",
-                f"DTSTAMP:{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
-                f"DTSTART:{dtstart}",
-                f"DTEND:{dtend}",
-                f"SUMMARY:{event['name']} - {profile['groom_name']} & {profile['bride_name']}",
-                f"LOCATION:{event['venue_name']}, {event['venue_address']}",
-                f"DESCRIPTION:{event.get('description', '')}",
-                "STATUS:CONFIRMED",
-                "END:VEVENT"
-            ])
-    else:
-        # Use main event_date
-        event_datetime = profile['event_date']
-        end_datetime = event_datetime + timedelta(hours=4)
-        
-        dtstart = event_datetime.strftime('%Y%m%dT%H%M%S')
-        dtend = end_datetime.strftime('%Y%m%dT%H%M%S')
-        
-        ics_lines.extend([
-            "BEGIN:VEVENT",
-            f"UID:{profile['id']}@wedding-invitation",
-            f"DTSTAMP:{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
-            f"DTSTART:{dtstart}",
-            f"DTEND:{dtend}",
-            f"SUMMARY:{profile['event_type'].title()} - {profile['groom_name']} & {profile['bride_name']}",
-            f"LOCATION:{profile['venue']}, {profile.get('city', '')}",
-            f"DESCRIPTION:Join us for our {profile['event_type']}",
-            "STATUS:CONFIRMED",
-            "END:VEVENT"
-        ])
-    
-    ics_lines.append("END:VCALENDAR")
-    ics_content = "\r\n".join(ics_lines)
-    
-    # Return as downloadable file
-    from fastapi.responses import Response
-    filename = f"wedding-{profile['groom_name']}-{profile['bride_name']}.ics".replace(" ", "-").lower()
-    
-    return Response(
-        content=ics_content,
-        media_type="text/calendar",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"'
-        }
-    )
-
-
 # Include the router in the main app
 app.include_router(api_router)
 
+# Refuse oversize photo uploads before the multipart body is buffered
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits=[
+        upload_limit(r"^/api/admin/profiles/[^/]+/upload-photo$", MAX_FILE_SIZE + MULTIPART_OVERHEAD),
+        upload_limit(
+            r"^/api/admin/profiles/[^/]+/upload-photos$",
+            MAX_PHOTOS_PER_PROFILE * MAX_FILE_SIZE + MULTIPART_OVERHEAD
+        ),
+    ]
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -2822,6 +2993,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_db_indexes():
+    """Provision MongoDB indexes for every query shape (idempotent)"""
+    try:
+        drift = await ensure_indexes(db)
+        if not drift:
+            logger.info("MongoDB indexes are up to date")
+    except Exception as e:
+        # Serving without indexes is slow but still correct
+        logger.error(f"Failed to provision MongoDB indexes: {e}")
+
+
+@app.on_event("startup")
+async def start_analytics_buffer():
+    analytics_buffer.start()
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Drain buffered analytics before the connection goes away
+    await analytics_buffer.stop()
+    pdf_exports.shutdown()
+    image_pool.shutdown()
+    pdf_pool.shutdown()
     client.close()
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Static serving of uploaded media with long-lived caching and range requests
+
+Content-addressed files (named by their SHA-256, see media_store.py) never
+change, so they are served as immutable for a year with the hash as ETag.
+Other files revalidate on every use. Single byte ranges get 206 responses,
+and bodies are sent with the ASGI pathsend / zerocopysend extensions when the
+server offers them.
+"""
+import os
+import re
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+CONTENT_ADDRESSED_NAME = re.compile(r"^([0-9a-f]{64})\.[a-z0-9]+$")
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into inclusive (start, end)
+
+    Returns None when the header should be ignored (malformed or multiple
+    ranges: the full file is served). Raises ValueError when unsatisfiable.
+    """
+    match = RANGE_HEADER.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        # Syntactically invalid (RFC 7233 2.1), so the header is ignored
+        return None
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError("unsatisfiable range")
+    return start, end
+
+
+class UploadFileResponse(FileResponse):
+    """FileResponse serving the whole file or one byte range, zero-copy when possible"""
+
+    def __init__(self, *args, byte_range: Optional[Tuple[int, int]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.byte_range = byte_range
+        if byte_range is not None:
+            start, end = byte_range
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{self.stat_result.st_size}"
+            self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        count = end - start + 1
+        extensions = scope.get("extensions") or {}
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if scope["method"].upper() == "HEAD" or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif self.byte_range is None and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        elif "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": start,
+                    "count": count,
+                    "more_body": False
+                })
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    # File shrank underneath us; end the body rather than hang the client
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        if self.background is not None:
+            await self.background()
+
+
+class UploadStaticFiles(StaticFiles):
+    """StaticFiles with immutable caching for content-addressed names and Range support"""
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+
+        headers = {"Accept-Ranges": "bytes"}
+        match = CONTENT_ADDRESSED_NAME.match(os.path.basename(full_path))
+        if match:
+            headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            headers["ETag"] = f'"{match.group(1)}"'
+        else:
+            headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+
+        response = UploadFileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if range_header is None or status_code != 200:
+            return response
+
+        # If-Range: only honour the range while the client's copy is current
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range.strip() not in (response.headers["etag"], response.headers["last-modified"]):
+            return response
+
+        try:
+            byte_range = parse_range(range_header, stat_result.st_size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={"Content-Range": f"bytes */{stat_result.st_size}", "Accept-Ranges": "bytes"}
+            )
+        if byte_range is None:
+            return response
+
+        return UploadFileResponse(
+            full_path, headers=headers, stat_result=stat_result, byte_range=byte_range
+        )
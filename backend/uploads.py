@@ -0,0 +1,131 @@
+"""
+Streaming, size-bounded handling of multipart photo uploads
+
+Oversize request bodies are rejected by UploadSizeLimitMiddleware before the
+multipart parser buffers them, and accepted files are copied chunk by chunk to
+a temporary file whose path is handed to the image worker, so an upload never
+has to be held in memory as a whole.
+"""
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Pattern, Tuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of each accepted image format
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Detect image format from magic bytes; None if not an accepted format"""
+    for signature, image_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+async def spool_upload(file: UploadFile, max_size: int, tmp_dir: Optional[str] = None) -> Path:
+    """
+    Copy an upload to a temporary file in chunks, enforcing max_size
+
+    The caller owns the returned file and must delete it.
+
+    Raises:
+        HTTPException 400: content is not a JPEG/PNG/WebP/GIF image
+        HTTPException 413: content exceeds max_size
+    """
+    fd, name = tempfile.mkstemp(prefix="upload_", suffix=".img", dir=tmp_dir)
+    path = Path(name)
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                if size == 0 and sniff_image_type(chunk) is None:
+                    raise HTTPException(status_code=400, detail="Invalid file type. Allowed: JPG, PNG, WebP, GIF")
+
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Maximum size: {max_size // (1024 * 1024)}MB"
+                    )
+                out.write(chunk)
+
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Empty file")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return path
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject request bodies over a per-route limit with 413
+
+    Declared Content-Length is checked before the app runs; bodies without one
+    (chunked) are counted as they are received and cut off at the limit.
+
+    Args:
+        limits: (path regex, max body bytes) pairs; the first match applies
+    """
+
+    def __init__(self, app, limits: List[Tuple[Pattern[str], int]]):
+        self.app = app
+        self.limits = limits
+
+    def _limit_for(self, path: str) -> Optional[int]:
+        for pattern, limit in self.limits:
+            if pattern.match(path):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = self._limit_for(scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                response = JSONResponse(status_code=413, content={"detail": "Request body too large"})
+                return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Re-raised by FastAPI's body parsing and rendered as a 413 response
+                    raise HTTPException(status_code=413, detail="Request body too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def upload_limit(path_regex: str, max_bytes: int) -> Tuple[Pattern[str], int]:
+    """Build an UploadSizeLimitMiddleware limit entry"""
+    return re.compile(path_regex), max_bytes
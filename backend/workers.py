@@ -0,0 +1,141 @@
+"""
+Bounded process pools for CPU-heavy work (image transcoding, PDF rendering)
+
+Work submitted through WorkerPool.run() executes in child processes, so the
+event loop keeps serving guest requests while it runs. The number of jobs
+running or queued is capped; beyond that WorkerPoolBusy is raised so callers
+can answer 503 instead of building an unbounded backlog.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPoolBusy(Exception):
+    """Raised when a pool already has max_pending jobs running or queued"""
+
+
+class WorkerPool:
+    """
+    Lazily started ProcessPoolExecutor with a queue-depth limit
+
+    Args:
+        name: Pool name used in logs and errors
+        max_workers: Number of worker processes
+        max_pending: Maximum jobs running or waiting at once
+        initializer: Optional function run once in each worker process
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_pending: int,
+        initializer: Optional[Callable[[], None]] = None
+    ):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.initializer = initializer
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        # Counters for the admin metrics endpoint
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and driver threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer
+            )
+        return self._executor
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Called from the executor's thread when a job really finishes
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._release_slot)
+
+    def _release_slot(self) -> None:
+        self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run fn(*args) in a worker process and return its result
+
+        fn and args must be picklable (module-level functions, plain data).
+        Raises WorkerPoolBusy when the pool is saturated and asyncio.TimeoutError
+        when timeout elapses. A timed-out job keeps running in its worker and
+        keeps its pending slot until it finishes, so slow jobs cannot push the
+        pool past max_pending.
+        """
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise WorkerPoolBusy(f"{self.name} pool is busy ({self._pending} jobs pending)")
+
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        started = time.monotonic()
+        job = None
+        try:
+            job = self._get_executor().submit(fn, *args)
+            job.add_done_callback(lambda _: self._release(loop))
+            result = await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM kill); start a fresh pool for the next job
+            logger.error(f"{self.name} worker pool broke, restarting it")
+            self._executor = None
+            self._failed += 1
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            if job is None:
+                # Never submitted, so no done-callback will free the slot
+                self._pending -= 1
+
+        elapsed = time.monotonic() - started
+        self._completed += 1
+        self._total_seconds += elapsed
+        self._max_seconds = max(self._max_seconds, elapsed)
+        return result
+
+    def stats(self) -> dict:
+        """Queue depth (including timed-out jobs still running) and job timing counters since process start"""
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timed_out": self._timed_out,
+            "rejected": self._rejected,
+            "avg_seconds": round(self._total_seconds / self._completed, 4) if self._completed else None,
+            "max_seconds": round(self._max_seconds, 4),
+        }
+
+    def shutdown(self) -> None:
+        """Stop worker processes, dropping jobs that have not started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,48 @@
+import asyncio
+import io
+import zipfile
+
+from pdf_export import PdfExportJob, PdfExportManager
+
+
+async def _zip_bytes(manager: PdfExportManager, job: PdfExportJob) -> bytes:
+    return b"".join([chunk async for chunk in manager.stream_zip(job)])
+
+
+def test_concurrent_add_file_keeps_each_entry_with_its_own_bytes():
+    async def run():
+        job = PdfExportJob([], [])
+        try:
+            names = [f"profile-{language}.pdf" for language in ("english", "telugu", "hindi", "tamil", "kannada")]
+            await asyncio.gather(*(job.add_file(name, name.encode()) for name in names))
+            await job.finish()
+            return names, await _zip_bytes(PdfExportManager(render=None), job)
+        finally:
+            job.cleanup()
+
+    names, data = asyncio.run(run())
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert sorted(archive.namelist()) == sorted(names)
+        for name in names:
+            assert archive.read(name) == name.encode()
+
+
+def test_export_job_zips_every_rendered_language():
+    async def render(profile: dict, language: str) -> bytes:
+        await asyncio.sleep(0)
+        return f"{profile['id']}/{language}".encode()
+
+    async def run():
+        manager = PdfExportManager(render, concurrency=4)
+        profile = {"id": "p1", "slug": "ravi-sita"}
+        job = manager.create([(profile, language) for language in ("english", "telugu", "hindi")], [])
+        try:
+            await job.task
+            return await _zip_bytes(manager, job)
+        finally:
+            manager.shutdown()
+
+    with zipfile.ZipFile(io.BytesIO(asyncio.run(run()))) as archive:
+        for language in ("english", "telugu", "hindi"):
+            assert archive.read(f"ravi-sita-{language}.pdf") == f"p1/{language}".encode()
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+import rate_limit
+from rate_limit import InMemoryRateLimiter, RateLimiter, RateLimitResult
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", fake)
+    return fake
+
+
+def hit(limiter, ip="203.0.113.7", endpoint="rsvp", limit=3):
+    return asyncio.run(limiter.hit(ip, endpoint, limit))
+
+
+def test_rate_limiter_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimiter()
+
+
+def test_allows_up_to_limit_then_blocks(clock):
+    limiter = InMemoryRateLimiter(window_seconds=60)
+
+    assert [hit(limiter).allowed for _ in range(3)] == [True, True, True]
+    assert not hit(limiter).allowed
+
+
+def test_limits_are_per_ip_and_endpoint(clock):
+    limiter = InMemoryRateLimiter(window_seconds=60)
+    for _ in range(3):
+        hit(limiter)
+
+    assert hit(limiter, ip="198.51.100.1").allowed
+    assert hit(limiter, endpoint="wishes").allowed
+
+
+def test_retry_after_counts_down_to_oldest_request_leaving_window(clock):
+    limiter = InMemoryRateLimiter(window_seconds=60)
+    hit(limiter)
+    clock.now += 10
+    hit(limiter)
+    hit(limiter)
+
+    assert hit(limiter) == RateLimitResult(False, 50)
+
+    clock.now += 49.5
+    assert hit(limiter) == RateLimitResult(False, 1)
+
+
+def test_requests_allowed_again_after_window_expires(clock):
+    limiter = InMemoryRateLimiter(window_seconds=60)
+    hit(limiter)
+    clock.now += 10
+    hit(limiter)
+    hit(limiter)
+
+    clock.now += 50
+    assert hit(limiter).allowed  # oldest request left the window
+    assert not hit(limiter).allowed
+
+    clock.now += 60
+    assert [hit(limiter).allowed for _ in range(3)] == [True, True, True]
+
+
+def test_evicts_least_recently_used_keys(clock):
+    limiter = InMemoryRateLimiter(window_seconds=60, max_keys=2)
+    for _ in range(3):
+        hit(limiter, ip="a")
+    hit(limiter, ip="b")
+    hit(limiter, ip="c")
+
+    assert hit(limiter, ip="a").allowed  # "a" was evicted, its count forgotten